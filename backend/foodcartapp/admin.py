@@ -1,4 +1,7 @@
+from django import forms
 from django.contrib import admin
+from django.core.exceptions import ValidationError
+from django.db.models import Q
 from django.shortcuts import reverse
 from django.templatetags.static import static
 from django.utils.html import format_html
@@ -6,18 +9,41 @@ from django.http import HttpResponseRedirect
 from django.utils.http import url_has_allowed_host_and_scheme
 
 from star_burger import settings
+from restaurateur.assignment import assign_restaurants, format_assignment_results
+from .menu import set_menu_availability
+from .paginators import EstimatedCountPaginator
+from .search import search_queryset
 from .models import Product
 from .models import ProductCategory
 from .models import Restaurant
 from .models import RestaurantMenuItem
 from .models import OrderProduct
 from .models import Order
+from .models import OrderEvent
+
+
+class NormalizedSearchMixin:
+    """Дополняет стандартный поиск админки поиском по нормализованному тексту.
+
+    Стандартный icontains по search_fields находит подстроки, а search_queryset
+    находит слова без учёта регистра кириллицы и с русской морфологией в PostgreSQL.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        matched, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if not search_term:
+            return matched, may_have_duplicates
+        found = search_queryset(queryset, search_term)
+        return queryset.filter(Q(pk__in=matched.values('pk')) | Q(pk__in=found.values('pk'))), False
 
 
 class RestaurantMenuItemInline(admin.TabularInline):
     model = RestaurantMenuItem
     extra = 0
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('restaurant', 'product')
+
 
 @admin.register(Restaurant)
 class RestaurantAdmin(admin.ModelAdmin):
@@ -31,13 +57,54 @@ class RestaurantAdmin(admin.ModelAdmin):
         'address',
         'contact_phone',
     ]
+    list_per_page = 50
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     inlines = [
         RestaurantMenuItemInline
     ]
 
 
+@admin.register(RestaurantMenuItem)
+class RestaurantMenuItemAdmin(admin.ModelAdmin):
+    list_display = [
+        'restaurant',
+        'product',
+        'availability',
+    ]
+    list_filter = [
+        'availability',
+        'restaurant',
+        'product__category',
+    ]
+    list_select_related = [
+        'restaurant',
+        'product',
+    ]
+    list_per_page = 50
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    search_fields = [
+        'product__name',
+    ]
+    actions = [
+        'make_available',
+        'make_unavailable',
+    ]
+
+    @admin.action(description='Вернуть в продажу')
+    def make_available(self, request, queryset):
+        changed = set_menu_availability(queryset, True)
+        self.message_user(request, f'Возвращено в продажу пунктов меню: {changed}')
+
+    @admin.action(description='Снять с продажи')
+    def make_unavailable(self, request, queryset):
+        changed = set_menu_availability(queryset, False)
+        self.message_user(request, f'Снято с продажи пунктов меню: {changed}')
+
+
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(NormalizedSearchMixin, admin.ModelAdmin):
     list_display = [
         'get_image_list_preview',
         'name',
@@ -50,9 +117,13 @@ class ProductAdmin(admin.ModelAdmin):
     list_filter = [
         'category',
     ]
+    list_select_related = [
+        'category',
+    ]
+    list_per_page = 50
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     search_fields = [
-        # FIXME SQLite can not convert letter case for cyrillic words properly, so search will be buggy.
-        # Migration to PostgreSQL is necessary
         'name',
         'category__name',
     ]
@@ -107,19 +178,138 @@ class ProductAdmin(admin.ModelAdmin):
 
 
 @admin.register(ProductCategory)
-class ProductAdmin(admin.ModelAdmin):
-    pass
+class ProductCategoryAdmin(NormalizedSearchMixin, admin.ModelAdmin):
+    search_fields = [
+        'name',
+    ]
 
 
 class OrderProductInline(admin.TabularInline):
     model = OrderProduct
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('product')
+
+
+class OrderAdminForm(forms.ModelForm):
+    # статус, который менеджер видел, когда открыл заказ
+    loaded_status = forms.CharField(widget=forms.HiddenInput, required=False)
+
+    class Meta:
+        model = Order
+        fields = '__all__'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['loaded_status'].initial = self.instance.status
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not self.instance.pk:
+            return cleaned_data
+
+        # админка сохраняет форму в транзакции: строка заблокирована до конца
+        # сохранения, и другой менеджер не сменит статус между проверкой и записью
+        saved_status = (
+            Order.objects
+            .select_for_update()
+            .filter(pk=self.instance.pk)
+            .values_list('status', flat=True)
+            .first()
+        )
+        if cleaned_data.get('loaded_status') and saved_status != cleaned_data['loaded_status']:
+            raise forms.ValidationError(
+                f'Пока вы редактировали заказ, его статус сменился на '
+                f'«{dict(Order.STATUS_CHOICES)[saved_status]}». Обновите страницу.'
+            )
+        return cleaned_data
+
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(NormalizedSearchMixin, admin.ModelAdmin):
+    form = OrderAdminForm
+    list_display = [
+        'id',
+        'status',
+        'payment_method',
+        'firstname',
+        'lastname',
+        'phonenumber',
+        'address',
+        'total_cost',
+        'cooking_restaurant',
+        'creation_at',
+    ]
+    list_filter = [
+        'status',
+        'payment_method',
+    ]
+    list_select_related = [
+        'cooking_restaurant',
+    ]
+    # для поиска в PostgreSQL есть триграммные индексы, см. миграцию 0030;
+    # имя, фамилию и адрес находит ещё и NormalizedSearchMixin
+    search_fields = [
+        'phonenumber',
+        'firstname',
+        'lastname',
+        'address',
+    ]
+    list_per_page = 50
+    # без этого админка на каждой странице считает COUNT(*) по всей таблице заказов
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     inlines = [
         OrderProductInline
     ]
+    readonly_fields = [
+        'total_cost',
+    ]
+    actions = [
+        'assign_nearest_restaurants',
+        'assign_restaurants_balancing_load',
+    ]
+
+    @admin.action(description='Передать в ближайшие рестораны')
+    def assign_nearest_restaurants(self, request, queryset):
+        results = assign_restaurants(queryset)
+        self.message_user(request, format_assignment_results(results))
+
+    @admin.action(description='Передать в ближайшие рестораны с учётом загрузки')
+    def assign_restaurants_balancing_load(self, request, queryset):
+        results = assign_restaurants(queryset, balance_load=True)
+        self.message_user(request, format_assignment_results(results))
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            super().save_model(request, obj, form, change)
+            return
+
+        # условный UPDATE: запись не пройдёт, если статус успел смениться
+        obj.update_search_text()
+        fields = {
+            field.attname: getattr(obj, field.attname)
+            for field in Order._meta.concrete_fields
+            if not field.primary_key
+        }
+        loaded_status = form.cleaned_data.get('loaded_status') or form.initial['status']
+        updated = Order.objects.filter(pk=obj.pk, status=loaded_status).update(**fields)
+        if not updated:
+            # возможно только в СУБД без блокировки строк: форма уже проверила статус
+            raise ValidationError('Статус заказа сменился во время сохранения')
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        Order.objects.filter(pk=form.instance.pk).update_total_cost()
+
+        # в initial статус до сохранения: clean() мог сам перевести заказ дальше
+        if not change:
+            kind = 'created'
+        elif form.initial.get('status') != form.instance.status:
+            kind = 'status_changed'
+        else:
+            kind = 'changed'
+        OrderEvent.publish(kind, [form.instance])
 
     def response_change(self, request, obj):
         res = super().response_change(request, obj)
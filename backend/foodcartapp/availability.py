@@ -0,0 +1,46 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import RestaurantMenuItem
+
+
+AVAILABILITY_INDEX_CACHE_KEY = 'foodcartapp:availability_index'
+
+
+def build_availability_index():
+    """Какие рестораны сейчас готовят каждый продукт: {id продукта: frozenset id ресторанов}"""
+    index = defaultdict(set)
+    menu_items = (
+        RestaurantMenuItem.objects
+        .filter(availability=True)
+        .values_list('product_id', 'restaurant_id')
+    )
+    for product_id, restaurant_id in menu_items:
+        index[product_id].add(restaurant_id)
+    return {product_id: frozenset(restaurant_ids) for product_id, restaurant_ids in index.items()}
+
+
+def get_availability_index():
+    index = cache.get(AVAILABILITY_INDEX_CACHE_KEY)
+    if index is None:
+        index = build_availability_index()
+        cache.set(AVAILABILITY_INDEX_CACHE_KEY, index, settings.MENU_CACHE_TIMEOUT)
+    return index
+
+
+def invalidate_availability_index():
+    cache.delete(AVAILABILITY_INDEX_CACHE_KEY)
+
+
+def get_capable_restaurant_ids(availability_index, product_ids):
+    """Рестораны, которые могут приготовить все перечисленные продукты"""
+    restaurant_sets = sorted(
+        (availability_index.get(product_id, frozenset()) for product_id in set(product_ids)),
+        key=len,
+    )
+    if not restaurant_sets:
+        return frozenset()
+    # начинаем с самого короткого множества, чтобы пересечение быстрее сужалось
+    return restaurant_sets[0].intersection(*restaurant_sets[1:])
@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.db import connection, transaction
+
+from placesapp.normalization import normalize_address
+from placesapp.tasks import enqueue_geocoding
+from .models import Order, OrderEvent, OrderProduct, Product
+from .serializers import OrderSerializer, build_order
+
+
+def get_ordered_product_ids(orders_data):
+    """id продуктов из всех заказов пакета, ещё не проверенных сериализатором"""
+    product_ids = set()
+    for order_data in orders_data:
+        if not isinstance(order_data, dict) or not isinstance(order_data.get('products'), list):
+            continue
+        for product_item in order_data['products']:
+            if not isinstance(product_item, dict):
+                continue
+            try:
+                product_ids.add(int(product_item.get('product')))
+            except (TypeError, ValueError):
+                continue
+    return product_ids
+
+
+def create_orders(validated_orders):
+    orders_with_products = [build_order(validated_data) for validated_data in validated_orders]
+    orders = [order for order, _ in orders_with_products]
+
+    # id созданных строк bulk_create возвращает только в PostgreSQL
+    if connection.features.can_return_rows_from_bulk_insert:
+        # bulk_create не вызывает save(), где заполняется текст для поиска
+        for order in orders:
+            order.update_search_text()
+        Order.objects.bulk_create(orders)
+    else:
+        for order in orders:
+            order.save()
+
+    OrderProduct.objects.bulk_create([
+        order_product
+        for _, order_products in orders_with_products
+        for order_product in order_products
+    ])
+    OrderEvent.publish('created', orders)
+    return orders
+
+
+def register_orders(orders_data):
+    """Проверяет и создаёт пакет заказов. Возвращает результат по каждому заказу"""
+    products = Product.objects.available().in_bulk(get_ordered_product_ids(orders_data))
+
+    results = [None] * len(orders_data)
+    valid_orders = []
+    for index, order_data in enumerate(orders_data):
+        serializer = OrderSerializer(data=order_data, context={'products': products})
+        if serializer.is_valid():
+            valid_orders.append((index, serializer.validated_data))
+        else:
+            results[index] = {'index': index, 'status': 400, 'errors': serializer.errors}
+
+    chunk_size = settings.ORDER_BATCH_CHUNK_SIZE
+    addresses = {}
+    for start in range(0, len(valid_orders), chunk_size):
+        chunk = valid_orders[start:start + chunk_size]
+        with transaction.atomic():
+            orders = create_orders([validated_data for _, validated_data in chunk])
+        for (index, _), order in zip(chunk, orders):
+            results[index] = {'index': index, 'status': 201, 'id': order.id}
+            addresses.setdefault(normalize_address(order.address), order.address)
+
+    # одинаковые адреса из разных заказов геокодируем один раз
+    for address in addresses.values():
+        enqueue_geocoding(address)
+    return results
@@ -0,0 +1,117 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import serializers
+from rest_framework.pagination import CursorPagination
+from rest_framework.renderers import JSONRenderer
+
+from .models import Product
+from .search import search_queryset
+
+
+CATALOG_CACHE_KEY = 'foodcartapp:catalog'
+
+PRODUCT_FIELDS = {
+    'id': lambda product: product.id,
+    'name': lambda product: product.name,
+    'price': lambda product: product.price,
+    'special_status': lambda product: product.special_status,
+    'description': lambda product: product.description,
+    'category': lambda product: {
+        'id': product.category.id,
+        'name': product.category.name,
+    } if product.category else None,
+    'image': lambda product: product.image.url,
+    'restaurant': lambda product: {
+        'id': product.id,
+        'name': product.name,
+    },
+}
+
+
+class ProductCursorPagination(CursorPagination):
+    ordering = 'id'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+def serialize_product(product, fields=tuple(PRODUCT_FIELDS)):
+    return {field: PRODUCT_FIELDS[field](product) for field in fields}
+
+
+def build_catalog():
+    products = Product.objects.select_related('category').available()
+    content = JSONRenderer().render([serialize_product(product) for product in products])
+    return {
+        'content': content,
+        'etag': hashlib.md5(content).hexdigest(),
+        'last_modified': int(time.time()),
+    }
+
+
+def get_catalog():
+    """Каталог доступных товаров, готовый к отдаче: JSON, ETag и время сборки"""
+    catalog = cache.get(CATALOG_CACHE_KEY)
+    if catalog is None:
+        catalog = build_catalog()
+        cache.set(CATALOG_CACHE_KEY, catalog, settings.MENU_CACHE_TIMEOUT)
+    return catalog
+
+
+def invalidate_catalog():
+    cache.delete(CATALOG_CACHE_KEY)
+
+
+def parse_query_param(query_params, name, field):
+    try:
+        return field.run_validation(query_params[name])
+    except serializers.ValidationError as error:
+        raise serializers.ValidationError({name: error.detail})
+
+
+def get_products_page(request):
+    """Часть каталога по параметрам запроса.
+
+    ?category=<id> и ?special=<true|false> фильтруют товары,
+    ?q= ищет товары по словам в названии товара или категории,
+    ?fields=id,name,price оставляет в ответе только перечисленные поля,
+    ?page_size= и ?cursor= включают постраничную выдачу.
+    """
+    query_params = request.query_params
+    products = Product.objects.available()
+
+    fields = tuple(PRODUCT_FIELDS)
+    if 'fields' in query_params:
+        fields = tuple(field.strip() for field in query_params['fields'].split(',') if field.strip())
+        unknown_fields = set(fields) - set(PRODUCT_FIELDS)
+        if unknown_fields:
+            raise serializers.ValidationError({
+                'fields': f'Неизвестные поля: {", ".join(sorted(unknown_fields))}'
+            })
+        if not fields:
+            raise serializers.ValidationError({'fields': 'Укажите хотя бы одно поле'})
+    if 'description' not in fields:
+        products = products.defer('description')
+    if 'category' in fields:
+        products = products.select_related('category')
+
+    if 'category' in query_params:
+        category_id = parse_query_param(query_params, 'category', serializers.IntegerField())
+        products = products.filter(category_id=category_id)
+    if 'special' in query_params:
+        special_status = parse_query_param(query_params, 'special', serializers.BooleanField())
+        products = products.filter(special_status=special_status)
+    if 'q' in query_params:
+        products = search_queryset(products, query_params['q'])
+
+    if 'page_size' not in query_params and 'cursor' not in query_params:
+        return [serialize_product(product, fields) for product in products.order_by('id')]
+
+    paginator = ProductCursorPagination()
+    page = paginator.paginate_queryset(products, request)
+    return paginator.get_paginated_response(
+        [serialize_product(product, fields) for product in page]
+    ).data
@@ -0,0 +1,119 @@
+import csv
+import json
+from collections import defaultdict
+
+from .models import Order, OrderProduct
+
+
+CSV_COLUMNS = [
+    'id',
+    'creation_at',
+    'status',
+    'payment_method',
+    'firstname',
+    'lastname',
+    'phonenumber',
+    'address',
+    'comment',
+    'cooking_restaurant',
+    'called_at',
+    'delivered_at',
+    'total_cost',
+    'items',
+]
+
+
+def get_orders_for_export(status=None, payment_method=None, created_from=None, created_to=None):
+    """Заказы за период с датами включительно"""
+    orders = Order.objects.select_related('cooking_restaurant').order_by('id')
+    if status:
+        orders = orders.filter(status=status)
+    if payment_method:
+        orders = orders.filter(payment_method=payment_method)
+    return orders.created_between(created_from, created_to)
+
+
+def format_datetime(value):
+    return value.isoformat() if value else None
+
+
+def serialize_orders(orders, items_by_order):
+    for order in orders:
+        yield {
+            'id': order.id,
+            'creation_at': format_datetime(order.creation_at),
+            'status': order.status,
+            'payment_method': order.payment_method,
+            'firstname': order.firstname,
+            'lastname': order.lastname,
+            'phonenumber': str(order.phonenumber),
+            'address': order.address,
+            'comment': order.comment,
+            'cooking_restaurant': order.cooking_restaurant.name if order.cooking_restaurant else None,
+            'called_at': format_datetime(order.called_at),
+            'delivered_at': format_datetime(order.delivered_at),
+            'total_cost': str(order.total_cost),
+            'items': items_by_order.get(order.id, []),
+        }
+
+
+def get_items_by_order(orders):
+    items = (
+        OrderProduct.objects
+        .filter(order__in=[order.id for order in orders])
+        .values_list('order_id', 'product_id', 'product__name', 'quantity', 'price')
+    )
+    items_by_order = defaultdict(list)
+    for order_id, product_id, product_name, quantity, price in items:
+        items_by_order[order_id].append({
+            'product_id': product_id,
+            'product': product_name,
+            'quantity': quantity,
+            'price': str(price),
+        })
+    return items_by_order
+
+
+def iter_order_records(orders, chunk_size=2000):
+    """Заказы с позициями, без загрузки всей выборки в память.
+
+    Заказы читаются курсором порциями по chunk_size, позиции каждой порции —
+    одним запросом.
+    """
+    chunk = []
+    for order in orders.iterator(chunk_size=chunk_size):
+        chunk.append(order)
+        if len(chunk) >= chunk_size:
+            yield from serialize_orders(chunk, get_items_by_order(chunk))
+            chunk = []
+    if chunk:
+        yield from serialize_orders(chunk, get_items_by_order(chunk))
+
+
+class Echo:
+    """Псевдофайл для csv.writer: возвращает записанную строку вместо записи"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv_lines(records):
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_COLUMNS)
+    for record in records:
+        record['items'] = '; '.join(
+            f'{item["product"]} x{item["quantity"]} по {item["price"]}'
+            for item in record['items']
+        )
+        yield writer.writerow([record[column] for column in CSV_COLUMNS])
+
+
+def iter_ndjson_lines(records):
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': (iter_csv_lines, 'text/csv; charset=utf-8'),
+    'ndjson': (iter_ndjson_lines, 'application/x-ndjson; charset=utf-8'),
+}
@@ -0,0 +1,60 @@
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+
+def get_request_fingerprint(data):
+    serialized_data = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(serialized_data.encode()).hexdigest()
+
+
+def claim_idempotency_key(key, data):
+    """Занимает ключ под текущий запрос.
+
+    Возвращает None, если запрос с этим ключом пришёл впервые, иначе — готовый
+    ответ: сохранённый ответ на первый запрос или ошибку. Вызывается внутри
+    транзакции: пока она не завершится, повторы с тем же ключом ждут на
+    уникальном индексе, а при откате ключ освобождается.
+    """
+    if len(key) > IdempotencyKey._meta.get_field('key').max_length:
+        return Response({'detail': 'Слишком длинный Idempotency-Key'}, status=400)
+
+    fingerprint = get_request_fingerprint(data)
+    now = timezone.now()
+    IdempotencyKey.objects.filter(key=key, expires_at__lte=now).delete()
+    try:
+        with transaction.atomic():
+            IdempotencyKey.objects.create(
+                key=key,
+                request_fingerprint=fingerprint,
+                expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+            )
+        return None
+    except IntegrityError:
+        stored_key = IdempotencyKey.objects.get(key=key)
+
+    if stored_key.request_fingerprint != fingerprint:
+        return Response(
+            {'detail': 'Idempotency-Key уже использован для другого запроса'},
+            status=422,
+        )
+    if stored_key.response_status is None:
+        return Response(
+            {'detail': 'Запрос с этим Idempotency-Key ещё обрабатывается'},
+            status=409,
+        )
+    return Response(stored_key.response_body, status=stored_key.response_status)
+
+
+def save_idempotent_response(key, response):
+    IdempotencyKey.objects.filter(key=key).update(
+        response_status=response.status_code,
+        response_body=response.data,
+    )
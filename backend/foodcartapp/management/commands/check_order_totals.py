@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from foodcartapp.models import Order
+
+
+class Command(BaseCommand):
+    help = 'Сверяет сохранённую стоимость заказов с суммой по позициям'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Исправить стоимость заказов, в которых найдено расхождение',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+        )
+
+    def handle(self, *args, **options):
+        orders = (
+            Order.objects
+            .calculate_order_total_cost()
+            .order_by()
+            .values_list('pk', 'total_cost', 'calculated_total_cost')
+        )
+        checked = 0
+        drifted_ids = []
+        for order_id, total_cost, calculated_total_cost in orders.iterator(chunk_size=options['chunk_size']):
+            checked += 1
+            if total_cost != (calculated_total_cost or 0):
+                drifted_ids.append(order_id)
+                if options['verbosity'] > 1:
+                    self.stdout.write(
+                        f'Заказ {order_id}: сохранено {total_cost}, по позициям {calculated_total_cost or 0}'
+                    )
+
+        self.stdout.write(f'Проверено заказов: {checked}, с расхождением: {len(drifted_ids)}')
+        if options['fix'] and drifted_ids:
+            chunk_size = options['chunk_size']
+            for start in range(0, len(drifted_ids), chunk_size):
+                Order.objects.filter(pk__in=drifted_ids[start:start + chunk_size]).update_total_cost()
+            self.stdout.write(f'Исправлено заказов: {len(drifted_ids)}')
@@ -0,0 +1,16 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from foodcartapp.models import OrderEvent
+
+
+class Command(BaseCommand):
+    help = 'Удаляет старые события ленты заказов'
+
+    def handle(self, *args, **options):
+        expired_at = timezone.now() - timedelta(seconds=settings.ORDER_EVENTS_TTL)
+        deleted, _ = OrderEvent.objects.filter(created_at__lte=expired_at).delete()
+        self.stdout.write(f'Удалено событий: {deleted}')
@@ -0,0 +1,50 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from foodcartapp.exports import EXPORT_FORMATS, get_orders_for_export, iter_order_records
+from foodcartapp.models import Order
+
+
+class Command(BaseCommand):
+    help = 'Выгружает заказы с позициями в CSV или NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='csv')
+        parser.add_argument(
+            '--status',
+            choices=[status for status, _ in Order.STATUS_CHOICES],
+            default=None,
+        )
+        parser.add_argument(
+            '--payment-method',
+            choices=[payment_method for payment_method, _ in Order.PAYMENT_METHOD_CHOICES],
+            default=None,
+        )
+        parser.add_argument('--from', dest='created_from', type=date.fromisoformat, default=None,
+                            help='Дата создания заказа с, ГГГГ-ММ-ДД')
+        parser.add_argument('--to', dest='created_to', type=date.fromisoformat, default=None,
+                            help='Дата создания заказа по, ГГГГ-ММ-ДД')
+        parser.add_argument('--output', default=None, help='Файл для выгрузки, по умолчанию stdout')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        orders = get_orders_for_export(
+            status=options['status'],
+            payment_method=options['payment_method'],
+            created_from=options['created_from'],
+            created_to=options['created_to'],
+        )
+        iter_lines, _ = EXPORT_FORMATS[options['format']]
+        lines = iter_lines(iter_order_records(orders, chunk_size=options['chunk_size']))
+
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+
+        try:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+                output.writelines(lines)
+        except OSError as error:
+            raise CommandError(error)
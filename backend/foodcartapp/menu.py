@@ -0,0 +1,33 @@
+from collections import defaultdict
+
+from django.db.models import Q
+
+from .models import RestaurantMenuItem
+from .signals import menu_changed
+
+
+def get_menu_items(pairs):
+    """Пункты меню по парам (id ресторана, id продукта), одним условием на ресторан"""
+    products_by_restaurant = defaultdict(set)
+    for restaurant_id, product_id in pairs:
+        products_by_restaurant[restaurant_id].add(product_id)
+
+    condition = Q()
+    for restaurant_id, product_ids in products_by_restaurant.items():
+        condition |= Q(restaurant_id=restaurant_id, product_id__in=product_ids)
+    if not condition:
+        return RestaurantMenuItem.objects.none()
+    return RestaurantMenuItem.objects.filter(condition)
+
+
+def set_menu_availability(menu_items, availability):
+    """Ставит пунктам меню доступность одним UPDATE и возвращает, сколько строк изменилось.
+
+    Кэши меню сбрасываются один раз на всё обновление, а не на каждый пункт.
+    """
+    menu_items = menu_items.exclude(availability=availability)
+    restaurant_ids = set(menu_items.values_list('restaurant_id', flat=True).distinct())
+    changed = menu_items.update(availability=availability)
+    if changed:
+        menu_changed.send(sender=RestaurantMenuItem, restaurant_ids=restaurant_ids)
+    return changed
@@ -0,0 +1,100 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Product, Restaurant, RestaurantMenuItem
+
+
+MENU_MATRIX_CACHE_KEY = 'foodcartapp:menu_matrix'
+
+
+def build_menu_matrix():
+    """Снимок меню для страницы продуктов менеджера.
+
+    restaurants — столбцы таблицы по порядку, products — строки,
+    bitmaps — {id продукта: битовая маска}, i-й бит маски означает,
+    что i-й ресторан сейчас готовит продукт.
+    """
+    restaurants = [
+        {'id': restaurant_id, 'name': name}
+        for restaurant_id, name in Restaurant.objects.order_by('name').values_list('id', 'name')
+    ]
+    columns = {restaurant['id']: column for column, restaurant in enumerate(restaurants)}
+    products = [
+        {
+            'id': product.id,
+            'name': product.name,
+            'category': product.category.name if product.category else None,
+            'price': product.price,
+            'image_url': product.image.url,
+        }
+        for product in Product.objects.select_related('category').order_by('id')
+    ]
+
+    bitmaps = {product['id']: 0 for product in products}
+    menu_items = (
+        RestaurantMenuItem.objects
+        .filter(availability=True)
+        .values_list('product_id', 'restaurant_id')
+    )
+    for product_id, restaurant_id in menu_items:
+        bitmaps[product_id] |= 1 << columns[restaurant_id]
+
+    return {
+        'restaurants': restaurants,
+        'columns': columns,
+        'products': products,
+        'bitmaps': bitmaps,
+    }
+
+
+def get_menu_matrix():
+    matrix = cache.get(MENU_MATRIX_CACHE_KEY)
+    if matrix is None:
+        matrix = build_menu_matrix()
+        cache.set(MENU_MATRIX_CACHE_KEY, matrix, settings.MENU_CACHE_TIMEOUT)
+    return matrix
+
+
+def invalidate_menu_matrix():
+    cache.delete(MENU_MATRIX_CACHE_KEY)
+
+
+def refresh_menu_matrix_restaurant(restaurant_id):
+    """Перечитывает из базы столбец одного ресторана в закэшированном снимке.
+
+    Читается только меню этого ресторана, остальной снимок не пересобирается.
+    """
+    matrix = cache.get(MENU_MATRIX_CACHE_KEY)
+    if matrix is None:
+        return
+    column = matrix['columns'].get(restaurant_id)
+    if column is None:
+        invalidate_menu_matrix()
+        return
+
+    available_product_ids = set(
+        RestaurantMenuItem.objects
+        .filter(restaurant_id=restaurant_id, availability=True)
+        .values_list('product_id', flat=True)
+    )
+    if not available_product_ids <= matrix['bitmaps'].keys():
+        # продукта ещё нет в снимке
+        invalidate_menu_matrix()
+        return
+
+    bit = 1 << column
+    bitmaps = matrix['bitmaps']
+    for product_id in bitmaps:
+        if product_id in available_product_ids:
+            bitmaps[product_id] |= bit
+        else:
+            bitmaps[product_id] &= ~bit
+    cache.set(MENU_MATRIX_CACHE_KEY, matrix, settings.MENU_CACHE_TIMEOUT)
+
+
+def iter_menu_matrix_rows(matrix):
+    """Строки таблицы: (продукт, [готовит ли ресторан, ...] по столбцам)"""
+    columns = range(len(matrix['restaurants']))
+    for product in matrix['products']:
+        bitmap = matrix['bitmaps'][product['id']]
+        yield product, [bool(bitmap >> column & 1) for column in columns]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.15 on 2026-10-18 20:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0023_auto_20230311_0914'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='restaurantmenuitem',
+            index=models.Index(fields=['product', 'availability'], name='menuitem_product_availability'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations, models, transaction
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+CHUNK_SIZE = 1000
+
+
+def fill_order_total_cost(apps, schema_editor):
+    Order = apps.get_model('foodcartapp', 'Order')
+    OrderProduct = apps.get_model('foodcartapp', 'OrderProduct')
+    items_cost = (
+        OrderProduct.objects
+        .filter(order=OuterRef('pk'))
+        .values('order')
+        .annotate(cost=Sum(F('price') * F('quantity')))
+        .values('cost')
+    )
+    order_ids = list(Order.objects.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(order_ids), CHUNK_SIZE):
+        chunk = order_ids[start:start + CHUNK_SIZE]
+        with transaction.atomic():
+            Order.objects.filter(pk__in=chunk).update(
+                total_cost=Coalesce(Subquery(items_cost), Value(0), output_field=models.DecimalField())
+            )
+
+
+class Migration(migrations.Migration):
+    # каждая порция заказов фиксируется отдельной транзакцией
+    atomic = False
+
+    dependencies = [
+        ('foodcartapp', '0025_order_total_cost'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_order_total_cost, migrations.RunPython.noop),
+    ]
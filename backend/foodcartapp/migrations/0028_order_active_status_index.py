@@ -0,0 +1,17 @@
+# Generated by Django 3.2.15 on 2026-10-18 20:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0027_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('status', 'D'), _negated=True), fields=['status', 'id'], name='order_active_status'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.15 on 2026-10-18 20:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0028_order_active_status_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderEvent',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('created', 'Заказ создан'), ('status_changed', 'Статус изменён'), ('changed', 'Заказ изменён')], max_length=20, verbose_name='событие')),
+                ('status', models.CharField(choices=[('A', 'Необработан'), ('B', 'Передан в ресторан'), ('C', 'Передан курьеру'), ('D', 'Выполнен')], max_length=1, verbose_name='статус заказа')),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='время события')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='foodcartapp.order', verbose_name='заказ')),
+            ],
+            options={
+                'verbose_name': 'событие по заказу',
+                'verbose_name_plural': 'события по заказам',
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+# поиск в админке — это icontains, то есть UPPER(поле::text) LIKE UPPER('%...%'):
+# такой запрос может использовать только триграммный индекс по тому же выражению
+TRIGRAM_INDEXES = [
+    ('order_phonenumber_trgm', 'foodcartapp_order', 'phonenumber'),
+    ('order_firstname_trgm', 'foodcartapp_order', 'firstname'),
+    ('order_lastname_trgm', 'foodcartapp_order', 'lastname'),
+    ('order_address_trgm', 'foodcartapp_order', 'address'),
+    ('product_name_trgm', 'foodcartapp_product', 'name'),
+    ('restaurant_name_trgm', 'foodcartapp_restaurant', 'name'),
+    ('restaurant_address_trgm', 'foodcartapp_restaurant', 'address'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for index_name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {index_name} ON {table} '
+            f'USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for index_name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0029_orderevent'),
+    ]
+
+    operations = [
+        # на других СУБД расширение не создаётся, а индексы пропускаются
+        TrigramExtension(),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.15 on 2026-10-18 20:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0030_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='search_text',
+            field=models.TextField(blank=True, editable=False, verbose_name='имя, фамилия и адрес для поиска'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='search_name',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='название для поиска'),
+        ),
+        migrations.AddField(
+            model_name='productcategory',
+            name='search_name',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='название для поиска'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+from django.db import migrations, transaction
+
+from foodcartapp.search import normalize_search_text
+
+
+CHUNK_SIZE = 1000
+
+# выражения совпадают с тем, что строит SearchVector(поле, config='russian'),
+# иначе PostgreSQL не использует индекс
+SEARCH_INDEXES = [
+    ('order_search_text_fts', 'foodcartapp_order', 'search_text'),
+    ('product_search_name_fts', 'foodcartapp_product', 'search_name'),
+    ('productcategory_search_name_fts', 'foodcartapp_productcategory', 'search_name'),
+]
+
+
+def fill_search_text(apps, schema_editor):
+    Order = apps.get_model('foodcartapp', 'Order')
+    Product = apps.get_model('foodcartapp', 'Product')
+    ProductCategory = apps.get_model('foodcartapp', 'ProductCategory')
+
+    for model in (Product, ProductCategory):
+        objects = list(model.objects.only('id', 'name'))
+        for obj in objects:
+            obj.search_name = normalize_search_text(obj.name)
+        model.objects.bulk_update(objects, ['search_name'], batch_size=CHUNK_SIZE)
+
+    order_ids = list(Order.objects.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(order_ids), CHUNK_SIZE):
+        with transaction.atomic():
+            orders = list(
+                Order.objects
+                .filter(pk__in=order_ids[start:start + CHUNK_SIZE])
+                .only('id', 'firstname', 'lastname', 'address')
+            )
+            for order in orders:
+                order.search_text = normalize_search_text(order.firstname, order.lastname, order.address)
+            Order.objects.bulk_update(orders, ['search_text'])
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for index_name, table, column in SEARCH_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {index_name} ON {table} '
+            f"USING gin (to_tsvector('russian'::regconfig, COALESCE({column}, '')))"
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for index_name, _, _ in SEARCH_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+
+class Migration(migrations.Migration):
+    # каждая порция заказов фиксируется отдельной транзакцией
+    atomic = False
+
+    dependencies = [
+        ('foodcartapp', '0031_search_text'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+        # индексы строятся после заполнения, чтобы не обновлять их на каждой порции
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -1,14 +1,19 @@
-from django.db import models
+from datetime import datetime, time, timedelta
+
+from django.db import models, transaction
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 from phonenumber_field.modelfields import PhoneNumberField
-from django.db.models import Sum, F
+from django.db.models import Sum, F, Q, Exists, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.db.models.signals import pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 from django.db.models import Prefetch
 from django.conf import settings
 from placesapp.models import Place
-from placesapp.location_utils import fetch_coordinates, save_place
+from placesapp.tasks import enqueue_geocoding
+from .search import normalize_search_text
 
 
 class Restaurant(models.Model):
@@ -37,19 +42,26 @@ class Restaurant(models.Model):
 
 class ProductQuerySet(models.QuerySet):
     def available(self):
-        products = (
-            RestaurantMenuItem.objects
-            .filter(availability=True)
-            .values_list('product')
+        menu_items = RestaurantMenuItem.objects.filter(
+            product=OuterRef('pk'),
+            availability=True,
         )
-        return self.filter(pk__in=products)
+        return self.filter(Exists(menu_items))
 
 
 class ProductCategory(models.Model):
+    SEARCH_FIELDS = ['search_name']
+
     name = models.CharField(
         'название',
         max_length=50
     )
+    search_name = models.CharField(
+        'название для поиска',
+        max_length=255,
+        blank=True,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = 'категория'
@@ -58,12 +70,24 @@ class ProductCategory(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.search_name = normalize_search_text(self.name)
+        super().save(*args, **kwargs)
+
 
 class Product(models.Model):
+    SEARCH_FIELDS = ['search_name', 'category__search_name']
+
     name = models.CharField(
         'название',
         max_length=50
     )
+    search_name = models.CharField(
+        'название для поиска',
+        max_length=255,
+        blank=True,
+        editable=False,
+    )
     category = models.ForeignKey(
         ProductCategory,
         verbose_name='категория',
@@ -100,6 +124,10 @@ class Product(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.search_name = normalize_search_text(self.name)
+        super().save(*args, **kwargs)
+
 
 class RestaurantMenuItem(models.Model):
     restaurant = models.ForeignKey(
@@ -126,16 +154,53 @@ class RestaurantMenuItem(models.Model):
         unique_together = [
             ['restaurant', 'product']
         ]
+        indexes = [
+            models.Index(
+                fields=['product', 'availability'],
+                name='menuitem_product_availability',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.restaurant.name} - {self.product.name}"
 
 
 class OrderQuerySet(models.QuerySet):
+    def created_between(self, created_from=None, created_to=None):
+        """Заказы, созданные в эти даты включительно.
+
+        Сравниваем с границами дня, а не через __date, чтобы работал индекс по creation_at.
+        """
+        orders = self
+        if created_from:
+            orders = orders.filter(
+                creation_at__gte=timezone.make_aware(datetime.combine(created_from, time.min))
+            )
+        if created_to:
+            next_day = created_to + timedelta(days=1)
+            orders = orders.filter(
+                creation_at__lt=timezone.make_aware(datetime.combine(next_day, time.min))
+            )
+        return orders
+
     def calculate_order_total_cost(self):
-        orders = self.annotate(total_cost=Sum(F('items__price') * F('items__quantity')))
+        """Стоимость заказов, посчитанная по позициям — для сверки с total_cost"""
+        orders = self.annotate(calculated_total_cost=Sum(F('items__price') * F('items__quantity')))
         return orders
 
+    def update_total_cost(self):
+        """Пересчитывает сохранённую стоимость заказов одним UPDATE"""
+        items_cost = (
+            OrderProduct.objects
+            .filter(order=OuterRef('pk'))
+            .values('order')
+            .annotate(cost=Sum(F('price') * F('quantity')))
+            .values('cost')
+        )
+        return self.update(
+            total_cost=Coalesce(Subquery(items_cost), Value(0), output_field=models.DecimalField())
+        )
+
 
 class Order(models.Model):
     STATUS_CHOICES = (
@@ -144,11 +209,24 @@ class Order(models.Model):
         ('C', 'Передан курьеру'),
         ('D', 'Выполнен')
     )
+    # статусы меняются только вперёд, можно через ступень
+    STATUS_TRANSITIONS = {
+        'A': ('B', 'C', 'D'),
+        'B': ('C', 'D'),
+        'C': ('D',),
+        'D': (),
+    }
+    # время, которое проставляется, когда заказ доходит до статуса
+    STATUS_TIMESTAMPS = {
+        'B': 'called_at',
+        'D': 'delivered_at',
+    }
 
     PAYMENT_METHOD_CHOICES = (
         ('C', 'Наличными'),
         ('E', 'Электронно'),
     )
+    SEARCH_FIELDS = ['search_text']
 
     firstname = models.CharField(
         max_length=255,
@@ -202,6 +280,13 @@ class Order(models.Model):
         null=True,
         db_index=True
     )
+    total_cost = models.DecimalField(
+        'Стоимость заказа',
+        max_digits=10,
+        decimal_places=2,
+        default=0,
+        validators=[MinValueValidator(0)]
+    )
     cooking_restaurant = models.ForeignKey(
         Restaurant,
         verbose_name='Выбранный для приготовления ресторан',
@@ -211,21 +296,93 @@ class Order(models.Model):
         blank=True,
         null=True
     )
+    search_text = models.TextField(
+        'имя, фамилия и адрес для поиска',
+        blank=True,
+        editable=False,
+    )
 
     objects = OrderQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'заказ'
         verbose_name_plural = 'заказы'
+        indexes = [
+            # выполненных заказов со временем большинство, а выбирают почти всегда активные
+            models.Index(
+                fields=['status', 'id'],
+                name='order_active_status',
+                condition=~Q(status='D'),
+            ),
+        ]
 
     def __str__(self):
         return f'{self.firstname} {self.lastname} {self.address.split(", ")[0]}'
 
+    def save(self, *args, **kwargs):
+        self.update_search_text()
+        super().save(*args, **kwargs)
+
+    def update_search_text(self):
+        self.search_text = normalize_search_text(self.firstname, self.lastname, self.address)
+
     def clean(self):
         if self.cooking_restaurant and self.status == 'A':
             self.status = 'B'
 
-        save_place(self.address)
+        # переход проверяем от статуса в базе, а не от того, что был в форме
+        if self.pk:
+            saved_status = Order.objects.filter(pk=self.pk).values_list('status', flat=True).first()
+            if saved_status and saved_status != self.status:
+                try:
+                    self.validate_transition(saved_status, self.status)
+                except ValidationError as error:
+                    raise ValidationError({'status': error.messages})
+
+        now = timezone.now()
+        for status, timestamp_field in self.STATUS_TIMESTAMPS.items():
+            if self.status >= status and not getattr(self, timestamp_field):
+                setattr(self, timestamp_field, now)
+
+        enqueue_geocoding(self.address)
+
+    @classmethod
+    def validate_transition(cls, old_status, new_status):
+        if new_status not in cls.STATUS_TRANSITIONS[old_status]:
+            statuses = dict(cls.STATUS_CHOICES)
+            raise ValidationError(
+                f'Заказ нельзя перевести из статуса «{statuses[old_status]}» '
+                f'в «{statuses[new_status]}»'
+            )
+
+    def change_status(self, new_status, **fields):
+        """Переводит заказ в новый статус одним условным UPDATE.
+
+        Если другой менеджер уже успел изменить статус заказа, ничего
+        не меняет и возвращает False. Недопустимый переход — ValidationError.
+        """
+        self.validate_transition(self.status, new_status)
+
+        now = Value(timezone.now(), output_field=models.DateTimeField())
+        updates = dict(fields, status=new_status)
+        for status, timestamp_field in self.STATUS_TIMESTAMPS.items():
+            if self.status < status <= new_status:
+                updates[timestamp_field] = Coalesce(timestamp_field, now)
+
+        updated = Order.objects.filter(pk=self.pk, status=self.status).update(**updates)
+        if updated:
+            self.refresh_from_db(fields=list(updates))
+            OrderEvent.publish('status_changed', [self])
+        return bool(updated)
+
+    def pass_to_restaurant(self, restaurant):
+        return self.change_status('B', cooking_restaurant=restaurant)
+
+    def pass_to_courier(self):
+        return self.change_status('C')
+
+    def complete(self):
+        return self.change_status('D')
 
 
 class OrderProduct(models.Model):
@@ -261,3 +418,55 @@ class OrderProduct(models.Model):
     def __str__(self):
         return f'{self.product} {self.quantity} шт.'
 
+
+class IdempotencyKey(models.Model):
+    key = models.CharField('ключ', max_length=255, unique=True)
+    request_fingerprint = models.CharField('отпечаток запроса', max_length=64)
+    response_status = models.PositiveSmallIntegerField('код ответа', null=True, blank=True)
+    response_body = models.JSONField('тело ответа', null=True, blank=True)
+    created_at = models.DateTimeField('время создания', default=timezone.now)
+    expires_at = models.DateTimeField('действует до', db_index=True)
+
+    class Meta:
+        verbose_name = 'ключ идемпотентности'
+        verbose_name_plural = 'ключи идемпотентности'
+
+    def __str__(self):
+        return self.key
+
+
+class OrderEvent(models.Model):
+    """Событие по заказу для ленты менеджеров: её читают по возрастанию id"""
+    KIND_CHOICES = (
+        ('created', 'Заказ создан'),
+        ('status_changed', 'Статус изменён'),
+        ('changed', 'Заказ изменён'),
+    )
+
+    order = models.ForeignKey(
+        Order,
+        verbose_name='заказ',
+        related_name='events',
+        on_delete=models.CASCADE,
+    )
+    kind = models.CharField('событие', max_length=20, choices=KIND_CHOICES)
+    status = models.CharField('статус заказа', max_length=1, choices=Order.STATUS_CHOICES)
+    created_at = models.DateTimeField('время события', default=timezone.now, db_index=True)
+
+    class Meta:
+        verbose_name = 'событие по заказу'
+        verbose_name_plural = 'события по заказам'
+
+    def __str__(self):
+        return f'{self.get_kind_display()}: заказ {self.order_id}'
+
+    @classmethod
+    def publish(cls, kind, orders):
+        """Записывает события по заказам после коммита текущей транзакции.
+
+        Так лента не покажет заказ из откатившейся транзакции, а id событий,
+        по которым её читают, идут почти в порядке коммитов.
+        """
+        events = [cls(order_id=order.id, kind=kind, status=order.status) for order in orders]
+        if events:
+            transaction.on_commit(lambda: cls.objects.bulk_create(events))
@@ -0,0 +1,23 @@
+from .models import OrderEvent
+
+
+def get_last_order_event_id():
+    return OrderEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def get_order_events(after_id, batch_size=100):
+    """Первые batch_size событий с id больше after_id, по порядку."""
+    return list(
+        OrderEvent.objects
+        .filter(id__gt=after_id)
+        .order_by('id')[:batch_size]
+    )
+
+
+def serialize_order_event(event):
+    return {
+        'id': event.id,
+        'kind': event.kind,
+        'order': event.order_id,
+        'status': event.status,
+    }
@@ -0,0 +1,40 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор, который для всей большой таблицы не считает строки через COUNT(*).
+
+    В PostgreSQL без фильтров число строк берётся из статистики планировщика
+    (pg_class.reltuples): оно приблизительное, зато не требует читать всю таблицу.
+    С фильтрами, на небольших таблицах и на других СУБД — обычный count().
+    """
+    # меньше этого числа строк точный подсчёт и так быстрый
+    estimate_threshold = 10000
+
+    @cached_property
+    def count(self):
+        estimate = self.get_estimated_count()
+        if estimate is not None and estimate >= self.estimate_threshold:
+            return estimate
+        return super().count
+
+    def get_estimated_count(self):
+        queryset = self.object_list
+        query = getattr(queryset, 'query', None)
+        if query is None or query.where:
+            return None
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # у ни разу не анализированной таблицы reltuples равен -1
+        if not row or row[0] < 0:
+            return None
+        return int(row[0])
@@ -0,0 +1,47 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from django.db import connections
+from django.db.models import Q
+
+
+SEARCH_CONFIG = 'russian'
+SEARCH_WORDS = re.compile(r'\w+')
+
+
+def normalize_search_text(*parts):
+    """Слова текста в нижнем регистре и с «е» вместо «ё».
+
+    Так текст хранится в теневых полях для поиска: SQLite не умеет сам
+    приводить кириллицу к одному регистру.
+    """
+    text = ' '.join(part for part in parts if part).casefold().replace('ё', 'е')
+    return ' '.join(SEARCH_WORDS.findall(text))
+
+
+def search_queryset(queryset, query):
+    """Строки, в одном из полей model.SEARCH_FIELDS которых есть все слова запроса.
+
+    В PostgreSQL это полнотекстовый поиск с русской морфологией по началу слов,
+    на остальных СУБД — поиск подстрок в нормализованном тексте.
+    """
+    words = normalize_search_text(query).split()
+    if not words:
+        return queryset
+    search_fields = queryset.model.SEARCH_FIELDS
+
+    condition = Q()
+    if connections[queryset.db].vendor == 'postgresql':
+        search_query = SearchQuery(
+            ' & '.join(f'{word}:*' for word in words),
+            config=SEARCH_CONFIG,
+            search_type='raw',
+        )
+        for number, field in enumerate(search_fields):
+            vector_name = f'search_vector_{number}'
+            queryset = queryset.alias(**{vector_name: SearchVector(field, config=SEARCH_CONFIG)})
+            condition |= Q(**{vector_name: search_query})
+    else:
+        for field in search_fields:
+            condition |= Q(*(Q(**{f'{field}__contains': word}) for word in words))
+    return queryset.filter(condition)
@@ -1,9 +1,13 @@
-from rest_framework.serializers import ModelSerializer
-from .models import Order, OrderProduct
-from placesapp.location_utils import save_place
+from rest_framework.serializers import BooleanField, IntegerField, ModelSerializer, Serializer, ValidationError
+from .models import Order, OrderProduct, Product
+from placesapp.tasks import enqueue_geocoding
 
 
 class OrderProductSerializer(ModelSerializer):
+    # продукты проверяются разом в OrderSerializer.validate_products,
+    # а не отдельным запросом на каждую позицию
+    product = IntegerField(min_value=1)
+
     class Meta:
         model = OrderProduct
         fields = ['product', 'quantity']
@@ -16,16 +20,54 @@ class OrderSerializer(ModelSerializer):
         model = Order
         fields = ['firstname', 'lastname', 'phonenumber', 'address', 'products']
 
-    def create(self, validated_data):
-        product_items = validated_data.pop('products')
-        order = Order.objects.create(**validated_data)
-        save_place(order.address)
-        order_products = [OrderProduct(
-            order=order,
-            price=product_item['product'].price,
-            product=product_item['product'],
-            quantity=product_item['quantity']
-        ) for product_item in product_items]
+    def validate_products(self, product_items):
+        product_ids = {product_item['product'] for product_item in product_items}
+        # при пакетной загрузке продукты всех заказов выбраны заранее одним запросом
+        products = self.context.get('products')
+        if products is None:
+            products = Product.objects.available().in_bulk(product_ids)
+
+        unavailable_ids = sorted(product_ids - products.keys())
+        if unavailable_ids:
+            raise ValidationError(
+                f'Продукты недоступны для заказа: {", ".join(map(str, unavailable_ids))}'
+            )
 
+        for product_item in product_items:
+            product_item['product'] = products[product_item['product']]
+        return product_items
+
+    def create(self, validated_data):
+        order, order_products = build_order(validated_data)
+        order.save()
+        enqueue_geocoding(order.address)
         OrderProduct.objects.bulk_create(order_products)
         return order
+
+
+def build_order(validated_data):
+    """Заказ и его позиции по данным OrderSerializer, ещё не сохранённые в базу"""
+    order_data = dict(validated_data)
+    product_items = order_data.pop('products')
+    total_cost = sum(
+        product_item['product'].price * product_item['quantity']
+        for product_item in product_items
+    )
+    order = Order(total_cost=total_cost, **order_data)
+    order_products = [OrderProduct(
+        order=order,
+        price=product_item['product'].price,
+        product=product_item['product'],
+        quantity=product_item['quantity']
+    ) for product_item in product_items]
+    return order, order_products
+
+
+class MenuItemKeySerializer(Serializer):
+    restaurant = IntegerField(min_value=1)
+    product = IntegerField(min_value=1)
+
+
+class MenuAvailabilitySerializer(Serializer):
+    availability = BooleanField()
+    items = MenuItemKeySerializer(many=True, allow_empty=False)
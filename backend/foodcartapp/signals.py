@@ -0,0 +1,46 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .availability import invalidate_availability_index
+from .catalog import invalidate_catalog
+from .menu_matrix import invalidate_menu_matrix, refresh_menu_matrix_restaurant
+from .models import Order, OrderProduct, Product, ProductCategory, Restaurant, RestaurantMenuItem
+
+
+# меню ресторанов изменено в обход save(), например одним UPDATE;
+# аргумент restaurant_ids — чьи меню поменялись
+menu_changed = Signal()
+
+
+def invalidate_menu_caches(restaurant_ids):
+    invalidate_availability_index()
+    invalidate_catalog()
+    for restaurant_id in restaurant_ids:
+        refresh_menu_matrix_restaurant(restaurant_id)
+
+
+@receiver([post_save, post_delete], sender=RestaurantMenuItem)
+def invalidate_menu_caches_on_item_change(sender, instance, **kwargs):
+    invalidate_menu_caches([instance.restaurant_id])
+
+
+@receiver(menu_changed)
+def invalidate_menu_caches_on_bulk_change(sender, restaurant_ids, **kwargs):
+    invalidate_menu_caches(restaurant_ids)
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=ProductCategory)
+def invalidate_product_caches(sender, **kwargs):
+    invalidate_catalog()
+    invalidate_menu_matrix()
+
+
+@receiver([post_save, post_delete], sender=Restaurant)
+def invalidate_restaurant_caches(sender, **kwargs):
+    invalidate_menu_matrix()
+
+
+@receiver([post_save, post_delete], sender=OrderProduct)
+def update_order_total_cost(sender, instance, **kwargs):
+    Order.objects.filter(pk=instance.order_id).update_total_cost()
@@ -0,0 +1,104 @@
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .models import Order, Product, Restaurant, RestaurantMenuItem
+
+
+class ProductAvailabilityTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        restaurants = [Restaurant.objects.create(name=f'Ресторан {number}') for number in range(3)]
+        cls.products = [
+            Product.objects.create(name=f'Продукт {number}', price=100, image='product.jpg')
+            for number in range(20)
+        ]
+        # каждый третий продукт нигде не продаётся, остальные — хотя бы в одном ресторане
+        RestaurantMenuItem.objects.bulk_create([
+            RestaurantMenuItem(
+                restaurant=restaurant,
+                product=product,
+                availability=number % 3 != 0 and restaurant == restaurants[number % 2],
+            )
+            for number, product in enumerate(cls.products)
+            for restaurant in restaurants
+        ])
+
+    def test_available_products(self):
+        expected_ids = {product.id for number, product in enumerate(self.products) if number % 3 != 0}
+        with self.assertNumQueries(1):
+            available_ids = {product.id for product in Product.objects.available()}
+        self.assertEqual(available_ids, expected_ids)
+
+    def test_menu_index_covers_available_filter(self):
+        # планы запросов у SQLite и PostgreSQL разные, поэтому проверяем
+        # сам индекс в базе, а не выбор планировщика
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, RestaurantMenuItem._meta.db_table)
+        index = constraints.get('menuitem_product_availability')
+        self.assertIsNotNone(index)
+        self.assertTrue(index['index'])
+        self.assertEqual(index['columns'], ['product_id', 'availability'])
+
+
+class RegisterOrderQueriesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        restaurant = Restaurant.objects.create(name='Ресторан')
+        cls.products = [
+            Product.objects.create(name=f'Продукт {number}', price=100, image='product.jpg')
+            for number in range(30)
+        ]
+        RestaurantMenuItem.objects.bulk_create([
+            RestaurantMenuItem(restaurant=restaurant, product=product) for product in cls.products
+        ])
+
+    def setUp(self):
+        # лимиты запросов хранятся в кэше
+        cache.clear()
+
+    def post_order(self, items_count):
+        return self.client.post(
+            '/api/order/',
+            {
+                'firstname': 'Иван',
+                'lastname': 'Петров',
+                'phonenumber': '+79161234567',
+                # у каждого заказа свой адрес, чтобы каждый раз ставилась задача геокодирования
+                'address': f'Москва, Тверская {items_count}',
+                'products': [
+                    {'product': product.id, 'quantity': 1} for product in self.products[:items_count]
+                ],
+            },
+            content_type='application/json',
+        )
+
+    def test_queries_do_not_depend_on_cart_size(self):
+        with CaptureQueriesContext(connection) as single_item_queries:
+            response = self.post_order(1)
+        self.assertEqual(response.status_code, 201)
+
+        for items_count in (5, 30):
+            with self.subTest(items_count=items_count):
+                with self.assertNumQueries(len(single_item_queries)):
+                    response = self.post_order(items_count)
+                self.assertEqual(response.status_code, 201)
+        items_counts = [order.items.count() for order in Order.objects.order_by('id')]
+        self.assertEqual(items_counts, [1, 5, 30])
+
+
+class OrderStatusTest(TestCase):
+    def test_clean_checks_transition_from_saved_status(self):
+        order = Order.objects.create(
+            firstname='Иван',
+            lastname='Петров',
+            phonenumber='+79161234567',
+            address='Москва, Тверская 1',
+            payment_method='C',
+            status='D',
+        )
+        order.status = 'A'
+        with self.assertRaises(ValidationError):
+            order.clean()
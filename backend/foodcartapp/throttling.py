@@ -0,0 +1,96 @@
+import time
+
+from phonenumber_field.phonenumber import to_python
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """Ограничение по «ведру токенов».
+
+    Лимит вида '30/hour' задаёт ёмкость ведра (30 запросов подряд) и скорость,
+    с которой оно наполняется (30 токенов в час). Состояние ведра хранится в
+    кэше Django, поэтому при нескольких воркерах кэш должен быть общим.
+    Чтение и запись ведра идут под блокировкой через атомарный cache.add,
+    иначе одновременные запросы все увидели бы одно и то же число токенов.
+    """
+    lock_timeout = 1
+    lock_attempts = 20
+    lock_retry_delay = 0.01
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        if not self.acquire_lock():
+            # ведро занято другими запросами с тем же ключом — это и есть всплеск
+            self.wait_seconds = self.lock_timeout
+            return False
+        try:
+            return self.take_token()
+        finally:
+            self.cache.delete(self.lock_key)
+
+    @property
+    def lock_key(self):
+        return f'{self.key}:lock'
+
+    def acquire_lock(self):
+        for _ in range(self.lock_attempts):
+            if self.cache.add(self.lock_key, True, self.lock_timeout):
+                return True
+            time.sleep(self.lock_retry_delay)
+        return False
+
+    def take_token(self):
+        self.now = self.timer()
+        capacity = self.num_requests
+        refill_rate = self.num_requests / self.duration
+
+        tokens, updated_at = self.cache.get(self.key, (capacity, self.now))
+        tokens = min(capacity, tokens + (self.now - updated_at) * refill_rate)
+        if tokens < 1:
+            self.wait_seconds = (1 - tokens) / refill_rate
+            self.cache.set(self.key, (tokens, self.now), self.duration)
+            return False
+
+        self.cache.set(self.key, (tokens - 1, self.now), self.duration)
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class OrderIPThrottle(TokenBucketThrottle):
+    scope = 'order_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request),
+        }
+
+
+class OrderPhoneThrottle(TokenBucketThrottle):
+    scope = 'order_phone'
+
+    def get_cache_key(self, request, view):
+        if not isinstance(request.data, dict) or not request.data.get('phonenumber'):
+            return None
+
+        phonenumber = to_python(request.data['phonenumber'])
+        if phonenumber and phonenumber.is_valid():
+            ident = phonenumber.as_e164
+        else:
+            ident = str(request.data['phonenumber']).strip()
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': ident,
+        }
+
+
+class OrderBatchThrottle(OrderIPThrottle):
+    scope = 'order_batch'
@@ -1,15 +1,27 @@
 import json
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from django.conf import settings
 from django.templatetags.static import static
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, parser_classes, permission_classes, throttle_classes
+from rest_framework.parsers import JSONParser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
-from .serializers import OrderSerializer
-from .models import Product, Order, OrderProduct
+from .serializers import MenuAvailabilitySerializer, OrderSerializer
+from .catalog import get_catalog, get_products_page
+from .idempotency import claim_idempotency_key, save_idempotent_response
+from .throttling import OrderBatchThrottle, OrderIPThrottle, OrderPhoneThrottle
+from .batch import register_orders
+from .menu import get_menu_items, set_menu_availability
+from .parsers import NDJSONParser
+from .models import Order, OrderEvent, OrderProduct
 from placesapp.models import Place
 from django.shortcuts import get_object_or_404
 from django.db import transaction
-from placesapp.location_utils import save_place
+
+
+CATALOG_QUERY_PARAMS = {'category', 'special', 'q', 'fields', 'page_size', 'cursor'}
 
 
 def banners_list_api(request):
@@ -37,34 +49,71 @@ def banners_list_api(request):
 
 @api_view(['GET'])
 def product_list_api(request):
-    products = Product.objects.select_related('category').available()
-    dumped_products = []
-    for product in products:
-        dumped_product = {
-            'id': product.id,
-            'name': product.name,
-            'price': product.price,
-            'special_status': product.special_status,
-            'description': product.description,
-            'category': {
-                'id': product.category.id,
-                'name': product.category.name,
-            } if product.category else None,
-            'image': product.image.url,
-            'restaurant': {
-                'id': product.id,
-                'name': product.name,
-            }
-        }
-        dumped_products.append(dumped_product)
-    return Response(dumped_products)
+    # запрос без параметров — весь каталог для витрины, он всегда лежит в кэше
+    if CATALOG_QUERY_PARAMS & set(request.query_params):
+        return Response(get_products_page(request))
+
+    catalog = get_catalog()
+    etag = quote_etag(catalog['etag'])
+    response = HttpResponse(catalog['content'], content_type='application/json')
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(catalog['last_modified'])
+    # на If-None-Match / If-Modified-Since отвечаем 304 без тела
+    return get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=catalog['last_modified'],
+        response=response,
+    )
 
 
 @api_view(['POST'])
+@throttle_classes([OrderIPThrottle, OrderPhoneThrottle])
 @transaction.atomic
 def register_order(request):
+    # повтор запроса с тем же Idempotency-Key получает ответ на первый запрос
+    idempotency_key = request.headers.get('Idempotency-Key')
+    if idempotency_key:
+        stored_response = claim_idempotency_key(idempotency_key, request.data)
+        if stored_response:
+            return stored_response
+
     serializer = OrderSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
-    serializer.create(serializer.validated_data)
-    return Response(serializer.data, status=201)
+    order = serializer.create(serializer.validated_data)
+    OrderEvent.publish('created', [order])
+    response = Response(serializer.data, status=201)
+
+    if idempotency_key:
+        save_idempotent_response(idempotency_key, response)
+    return response
 
+
+@api_view(['POST'])
+@parser_classes([JSONParser, NDJSONParser])
+@permission_classes([IsAuthenticated])
+@throttle_classes([OrderBatchThrottle])
+def register_orders_batch(request):
+    """Пакет заказов от партнёров: JSON-массив или NDJSON, по заказу на строку"""
+    orders_data = request.data
+    if not isinstance(orders_data, list):
+        return Response({'detail': 'Ожидается список заказов'}, status=400)
+    if len(orders_data) > settings.ORDER_BATCH_MAX_SIZE:
+        return Response(
+            {'detail': f'В пакете не может быть больше {settings.ORDER_BATCH_MAX_SIZE} заказов'},
+            status=400,
+        )
+    return Response({'results': register_orders(orders_data)})
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def update_menu_availability(request):
+    """Снимает с продажи или возвращает в продажу сразу много пунктов меню ресторанов"""
+    serializer = MenuAvailabilitySerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    menu_items = get_menu_items(
+        (item['restaurant'], item['product']) for item in serializer.validated_data['items']
+    )
+    changed = set_menu_availability(menu_items, serializer.validated_data['availability'])
+    return Response({'changed': changed})
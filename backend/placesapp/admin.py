@@ -1,6 +1,24 @@
 from django.contrib import admin
-from placesapp.models import Place
+from placesapp.models import Place, GeocodingTask
 
 @admin.register(Place)
 class PlaceAdmin(admin.ModelAdmin):
     pass
+
+
+@admin.register(GeocodingTask)
+class GeocodingTaskAdmin(admin.ModelAdmin):
+    list_display = [
+        'address',
+        'status',
+        'attempts',
+        'created_at',
+        'processed_at',
+        'next_attempt_at',
+    ]
+    list_filter = [
+        'status',
+    ]
+    search_fields = [
+        'address',
+    ]
@@ -0,0 +1,173 @@
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class GeocoderUnavailable(requests.exceptions.RequestException):
+    """Геокодер недавно часто отвечал ошибками, запрос даже не отправлялся"""
+
+
+class CircuitBreaker:
+    """Размыкает цепь после `failure_threshold` ошибок подряд.
+
+    Пока цепь разомкнута, запросы сразу отклоняются. Через `reset_timeout`
+    секунд пропускается один пробный запрос: если он успешен, цепь замыкается.
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # пробный запрос; до его результата остальные ждут ещё один период
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+
+class GeocoderStats:
+    """Счётчики запросов к геокодеру"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.rejected = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency, failed):
+        with self._lock:
+            self.requests += 1
+            self.errors += failed
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
+    def record_rejected(self):
+        with self._lock:
+            self.rejected += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'errors': self.errors,
+                'rejected': self.rejected,
+                'error_rate': self.errors / self.requests if self.requests else 0.0,
+                'avg_latency': self.total_latency / self.requests if self.requests else 0.0,
+                'max_latency': self.max_latency,
+            }
+
+
+class RateLimiter:
+    """Пропускает не больше `rate` запросов в секунду на все потоки сразу"""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.next_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self.next_at - now
+            self.next_at = max(now, self.next_at) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class GeocoderClient:
+    def __init__(self, base_url, connect_timeout, read_timeout, retries,
+                 retry_backoff, pool_size, breaker):
+        self.base_url = base_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.breaker = breaker
+        self.stats = GeocoderStats()
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=retry_backoff,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=['GET'],
+            raise_on_status=False,
+            # Retry-After на 429 и 503 ничем не ограничен и может усыпить
+            # воркер на часы; паузы между попытками задаёт только backoff_factor
+            respect_retry_after_header=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(self, params):
+        """GET-запрос к геокодеру, возвращает разобранный JSON"""
+        if not self.breaker.allow_request():
+            self.stats.record_rejected()
+            raise GeocoderUnavailable(f'Геокодер {self.base_url} временно недоступен')
+
+        started_at = time.monotonic()
+        try:
+            response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.exceptions.RequestException:
+            self.stats.record(time.monotonic() - started_at, failed=True)
+            self.breaker.record_failure()
+            raise
+
+        self.stats.record(time.monotonic() - started_at, failed=False)
+        self.breaker.record_success()
+        return response.json()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_geocoder_client():
+    """Общий на процесс клиент геокодера с пулом соединений"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = GeocoderClient(
+                base_url=settings.GEOCODER_URL,
+                connect_timeout=settings.GEOCODER_CONNECT_TIMEOUT,
+                read_timeout=settings.GEOCODER_READ_TIMEOUT,
+                retries=settings.GEOCODER_RETRIES,
+                retry_backoff=settings.GEOCODER_RETRY_BACKOFF,
+                pool_size=settings.GEOCODER_POOL_SIZE,
+                breaker=CircuitBreaker(
+                    failure_threshold=settings.GEOCODER_BREAKER_THRESHOLD,
+                    reset_timeout=settings.GEOCODER_BREAKER_RESET_TIMEOUT,
+                ),
+            )
+        return _client
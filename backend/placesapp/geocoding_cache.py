@@ -0,0 +1,99 @@
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from placesapp.models import Place
+from placesapp.normalization import normalize_address
+
+
+class PlacesLRUCache:
+    """Кэш последних геокодированных адресов в памяти процесса"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, address):
+        with self._lock:
+            item = self._items.get(address)
+            if item is not None:
+                self._items.move_to_end(address)
+            return item
+
+    def set(self, address, item):
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._items[address] = item
+            self._items.move_to_end(address)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def delete(self, address):
+        with self._lock:
+            self._items.pop(address, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+places_cache = PlacesLRUCache(settings.GEOCODER_LRU_SIZE)
+
+
+def is_fresh(latitude, longitude, update_at):
+    """Координаты живут GEOCODER_CACHE_TTL секунд, отсутствие координат — GEOCODER_NEGATIVE_CACHE_TTL"""
+    if latitude is None or longitude is None:
+        ttl = settings.GEOCODER_NEGATIVE_CACHE_TTL
+    else:
+        ttl = settings.GEOCODER_CACHE_TTL
+    return update_at + timedelta(seconds=ttl) > timezone.now()
+
+
+def find_place(address):
+    """Ищет место по нормализованному адресу, самое свежее из дублей"""
+    return (
+        Place.objects
+        .filter(normalized_address=normalize_address(address))
+        .order_by('-update_at')
+        .first()
+    )
+
+
+def remember_place(place):
+    places_cache.set(
+        normalize_address(place.address),
+        (place.latitude, place.longitude, place.update_at)
+    )
+
+
+def get_fresh_coordinates(address):
+    """Ищет свежий результат геокодирования сначала в памяти, потом в таблице Place.
+
+    Возвращает пару (найдено, координаты); координаты равны None,
+    если геокодер недавно не смог определить адрес.
+    """
+    cache_key = normalize_address(address)
+    cached = places_cache.get(cache_key)
+    if cached is not None and not is_fresh(*cached):
+        # запись в памяти устарела, но воркер в другом процессе мог
+        # уже обновить Place, поэтому перечитываем таблицу
+        places_cache.delete(cache_key)
+        cached = None
+    if cached is None:
+        place = find_place(address)
+        if not place:
+            return False, None
+        cached = (place.latitude, place.longitude, place.update_at)
+        places_cache.set(cache_key, cached)
+
+    latitude, longitude, update_at = cached
+    if not is_fresh(latitude, longitude, update_at):
+        return False, None
+    if latitude is None or longitude is None:
+        return True, None
+    return True, (latitude, longitude)
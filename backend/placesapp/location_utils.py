@@ -3,19 +3,20 @@ from django.utils import timezone
 from django.shortcuts import render
 from django.conf import settings
 from placesapp.models import Place
+from placesapp.geocoder_client import get_geocoder_client
+from placesapp.geocoding_cache import get_fresh_coordinates, remember_place, find_place
+from placesapp.normalization import normalize_address
 
 
 def fetch_coordinates(apikey, address):
-    base_url = "https://geocode-maps.yandex.ru/1.x"
-    response = requests.get(base_url, params={
-        "geocode": address,
-        "apikey": apikey,
-        "format": "json",
-    })
-    response.raise_for_status()
-
+    geocoder = get_geocoder_client()
     try:
-        found_places = response.json()['response']['GeoObjectCollection']['featureMember']
+        response = geocoder.get({
+            "geocode": address,
+            "apikey": apikey,
+            "format": "json",
+        })
+        found_places = response['response']['GeoObjectCollection']['featureMember']
     except (KeyError, ValueError):
         return None
 
@@ -27,25 +28,54 @@ def fetch_coordinates(apikey, address):
     return lat, lon
 
 
-def save_place(address):
-    place, _ = Place.objects.get_or_create(address=address)
+def save_place(address, raise_errors=False):
+    """Геокодирует адрес, если для него нет свежего результата в кэше.
+
+    Сбой геокодера не записывается как «адрес не найден»: с raise_errors
+    ошибка пробрасывается вызывающему, чтобы тот повторил попытку позже,
+    без него адрес просто остаётся без координат до следующего вызова.
+    """
+    is_cached, _ = get_fresh_coordinates(address)
+    if is_cached:
+        return
+
     try:
         place_coords = fetch_coordinates(
             settings.YANDEX_GEOCODER_API_KEY,
             address
         )
-    except (requests.exceptions.HTTPError, requests.exceptions.RequestException):
-        place.latitude = place.longitude = None
-        place.update_time = timezone.now()
-        place.save()
+    except requests.exceptions.RequestException:
+        # известные координаты при этом не затираются
+        if raise_errors:
+            raise
         return
 
-    if not place_coords:
-        place.latitude = place.longitude = None
-        place.update_time = timezone.now()
-        place.save()
-        return
-
-    place.latitude, place.longitude = place_coords
+    place = find_place(address)
+    if not place:
+        place, _ = Place.objects.get_or_create(address=address)
+    place.latitude, place.longitude = place_coords or (None, None)
+    place.update_at = timezone.now()
     place.save()
+    remember_place(place)
+
 
+def get_places_coordinates(addresses):
+    """Координаты уже геокодированных адресов одним запросом: {адрес: (широта, долгота)}.
+
+    Адресов, для которых координаты неизвестны, в ответе нет.
+    """
+    keys = {address: normalize_address(address) for address in addresses}
+    places = (
+        Place.objects
+        .filter(
+            normalized_address__in=set(keys.values()),
+            latitude__isnull=False,
+            longitude__isnull=False,
+        )
+        .order_by('update_at')
+    )
+    coordinates = {
+        place.normalized_address: (float(place.latitude), float(place.longitude))
+        for place in places
+    }
+    return {address: coordinates[key] for address, key in keys.items() if key in coordinates}
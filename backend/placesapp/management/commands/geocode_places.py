@@ -0,0 +1,108 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from placesapp.geocoder_client import RateLimiter, get_geocoder_client
+from placesapp.location_utils import fetch_coordinates
+from placesapp.models import Place
+
+
+class Command(BaseCommand):
+    help = 'Геокодирует места без координат или с устаревшими координатами'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Сколько запросов к геокодеру выполнять параллельно',
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=10,
+            help='Не больше стольких запросов в секунду на все потоки',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Сколько мест сохранять одним запросом',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Обработать не больше стольких мест',
+        )
+
+    def handle(self, *args, **options):
+        stale_before = timezone.now() - timedelta(seconds=settings.GEOCODER_CACHE_TTL)
+        places = (
+            Place.objects
+            .filter(
+                Q(latitude__isnull=True)
+                | Q(longitude__isnull=True)
+                | Q(update_at__lt=stale_before)
+            )
+            .only('id', 'address')
+            .order_by('id')
+        )
+        rate_limiter = RateLimiter(options['rate'])
+        chunk_size = options['chunk_size']
+        limit = options['limit']
+
+        def geocode(place):
+            rate_limiter.wait()
+            try:
+                return place, fetch_coordinates(settings.YANDEX_GEOCODER_API_KEY, place.address), None
+            except requests.exceptions.RequestException as error:
+                return place, None, error
+
+        started_at = time.monotonic()
+        processed = geocoded = not_found = failed = 0
+        last_id = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            while limit is None or processed < limit:
+                size = chunk_size if limit is None else min(chunk_size, limit - processed)
+                # выбираем порциями по id, чтобы не держать курсор открытым во время записи
+                chunk = list(places.filter(id__gt=last_id)[:size])
+                if not chunk:
+                    break
+                last_id = chunk[-1].id
+
+                updated_places = []
+                for place, place_coords, error in executor.map(geocode, chunk):
+                    processed += 1
+                    if error:
+                        failed += 1
+                        if options['verbosity'] > 1:
+                            self.stderr.write(f'{place.address}: {error}')
+                        continue
+                    if place_coords:
+                        geocoded += 1
+                    else:
+                        not_found += 1
+                    place.latitude, place.longitude = place_coords or (None, None)
+                    place.update_at = timezone.now()
+                    updated_places.append(place)
+
+                Place.objects.bulk_update(updated_places, ['latitude', 'longitude', 'update_at'])
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'Обработано мест: {processed}')
+
+        elapsed = time.monotonic() - started_at
+        throughput = processed / elapsed if elapsed else 0
+        stats = get_geocoder_client().stats.snapshot()
+        self.stdout.write(
+            f'Обработано мест: {processed} за {elapsed:.1f} с ({throughput:.1f} в секунду)\n'
+            f'Найдены координаты: {geocoded}, не найдены: {not_found}, ошибки: {failed}\n'
+            f'Средняя задержка геокодера: {stats["avg_latency"]:.3f} с, '
+            f'отклонено предохранителем: {stats["rejected"]}'
+        )
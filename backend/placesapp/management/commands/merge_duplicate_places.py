@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from placesapp.models import Place
+
+
+DELETE_CHUNK_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = 'Объединяет места, адреса которых совпадают после нормализации'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать, сколько мест будет удалено',
+        )
+
+    def handle(self, *args, **options):
+        duplicated_addresses = (
+            Place.objects
+            .values('normalized_address')
+            .annotate(places_count=Count('id'))
+            .filter(places_count__gt=1)
+            .values_list('normalized_address', flat=True)
+        )
+        places = (
+            Place.objects
+            .filter(normalized_address__in=duplicated_addresses)
+            .values_list('id', 'normalized_address', 'latitude', 'update_at')
+        )
+
+        # в каждой группе оставляем место с координатами, обновлённое последним
+        best_places = {}
+        duplicate_ids = []
+        for place_id, normalized_address, latitude, update_at in places.iterator(chunk_size=2000):
+            rank = (latitude is not None, update_at)
+            best = best_places.get(normalized_address)
+            if best is None:
+                best_places[normalized_address] = (rank, place_id)
+            elif rank > best[0]:
+                duplicate_ids.append(best[1])
+                best_places[normalized_address] = (rank, place_id)
+            else:
+                duplicate_ids.append(place_id)
+
+        if not options['dry_run']:
+            with transaction.atomic():
+                for start in range(0, len(duplicate_ids), DELETE_CHUNK_SIZE):
+                    chunk = duplicate_ids[start:start + DELETE_CHUNK_SIZE]
+                    Place.objects.filter(id__in=chunk).delete()
+
+        self.stdout.write(
+            f'Групп дублей: {len(best_places)}, удалено мест: {len(duplicate_ids)}'
+        )
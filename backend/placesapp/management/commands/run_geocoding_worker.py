@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from placesapp.tasks import process_geocoding_tasks
+
+
+class Command(BaseCommand):
+    help = 'Обрабатывает очередь задач геокодирования адресов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Разобрать очередь один раз и завершиться',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=1.0,
+            help='Пауза в секундах, когда очередь пуста',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            processed = process_geocoding_tasks()
+            if processed:
+                self.stdout.write(f'Обработано задач: {processed}')
+            if options['once']:
+                return
+            time.sleep(options['sleep'])
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.15 on 2026-10-18 20:28
+
+from django.db import migrations, models
+
+from placesapp.normalization import normalize_address
+
+
+def fill_normalized_address(apps, schema_editor):
+    Place = apps.get_model('placesapp', 'Place')
+    places = Place.objects.only('id', 'address')
+    for place in places.iterator(chunk_size=2000):
+        place.normalized_address = normalize_address(place.address)
+        place.save(update_fields=['normalized_address'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('placesapp', '0005_geocodingtask'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='normalized_address',
+            field=models.CharField(blank=True, db_index=True, max_length=255, verbose_name='Нормализованный адрес'),
+        ),
+        migrations.RunPython(fill_normalized_address, migrations.RunPython.noop),
+    ]
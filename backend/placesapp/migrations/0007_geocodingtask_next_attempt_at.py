@@ -0,0 +1,19 @@
+# Generated by Django 3.2.15 on 2026-10-18 20:54
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('placesapp', '0006_place_normalized_address'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='geocodingtask',
+            name='next_attempt_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Следующая попытка'),
+        ),
+    ]
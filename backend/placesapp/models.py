@@ -1,10 +1,17 @@
 from django.db import models
 from django.utils import timezone
 from django.conf import settings
+from placesapp.normalization import normalize_address
 
 
 class Place(models.Model):
     address = models.CharField('Адрес', max_length=255, unique=True)
+    normalized_address = models.CharField(
+        'Нормализованный адрес',
+        max_length=255,
+        blank=True,
+        db_index=True
+    )
     longitude = models.DecimalField(
         'Долгота',
         max_digits=9,
@@ -27,3 +34,36 @@ class Place(models.Model):
 
     def __str__(self):
         return self.address
+
+    def save(self, *args, **kwargs):
+        self.normalized_address = normalize_address(self.address)
+        super().save(*args, **kwargs)
+
+
+class GeocodingTask(models.Model):
+    STATUS_CHOICES = (
+        ('P', 'В очереди'),
+        ('D', 'Выполнена'),
+        ('F', 'Ошибка'),
+    )
+
+    address = models.CharField('Адрес', max_length=255)
+    status = models.CharField(
+        'Статус',
+        max_length=1,
+        choices=STATUS_CHOICES,
+        default='P',
+        db_index=True
+    )
+    attempts = models.PositiveSmallIntegerField('Количество попыток', default=0)
+    error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField('Время создания', default=timezone.now, db_index=True)
+    processed_at = models.DateTimeField('Время обработки', blank=True, null=True)
+    next_attempt_at = models.DateTimeField('Следующая попытка', default=timezone.now, db_index=True)
+
+    class Meta:
+        verbose_name = 'Задача геокодирования'
+        verbose_name_plural = 'Задачи геокодирования'
+
+    def __str__(self):
+        return f'{self.address} ({self.get_status_display()})'
@@ -0,0 +1,47 @@
+import re
+
+
+ADDRESS_ABBREVIATIONS = {
+    'г': 'город',
+    'обл': 'область',
+    'р-н': 'район',
+    'мкр': 'микрорайон',
+    'мкрн': 'микрорайон',
+    'ул': 'улица',
+    'пр': 'проспект',
+    'пр-т': 'проспект',
+    'просп': 'проспект',
+    'пр-д': 'проезд',
+    'пер': 'переулок',
+    'пл': 'площадь',
+    'ш': 'шоссе',
+    'наб': 'набережная',
+    'б-р': 'бульвар',
+    'бул': 'бульвар',
+    'туп': 'тупик',
+    'д': 'дом',
+    'корп': 'корпус',
+    'к': 'корпус',
+    'стр': 'строение',
+    'кв': 'квартира',
+}
+
+NOT_ADDRESS_CHARS = re.compile(r'[^\w-]+')
+
+# длина поля Place.normalized_address
+NORMALIZED_ADDRESS_MAX_LENGTH = 255
+
+
+def normalize_address(address):
+    """Приводит адрес к ключу для поиска дублей.
+
+    «Москва, Тверская ул. 1» и «москва,  тверская улица, 1» дают один ключ.
+    """
+    address = address.casefold().replace('ё', 'е')
+    words = []
+    for word in NOT_ADDRESS_CHARS.sub(' ', address).split():
+        word = word.strip('-')
+        if not word:
+            continue
+        words.append(ADDRESS_ABBREVIATIONS.get(word, word))
+    return ' '.join(words)[:NORMALIZED_ADDRESS_MAX_LENGTH]
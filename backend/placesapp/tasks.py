@@ -0,0 +1,76 @@
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from placesapp.models import GeocodingTask
+from placesapp.location_utils import save_place
+from placesapp.geocoding_cache import get_fresh_coordinates
+
+
+def enqueue_geocoding(address):
+    """Ставит адрес в очередь на геокодирование.
+
+    В режиме `sync` адрес геокодируется сразу, в текущем процессе —
+    это удобно для тестов и локальной разработки.
+    Адреса со свежим результатом геокодирования в очередь не попадают.
+    """
+    is_cached, _ = get_fresh_coordinates(address)
+    if is_cached:
+        return
+
+    if settings.GEOCODING_QUEUE_BACKEND == 'sync':
+        save_place(address)
+        return
+
+    already_queued = GeocodingTask.objects.filter(address=address, status='P').exists()
+    if not already_queued:
+        GeocodingTask.objects.create(address=address)
+
+
+def process_next_geocoding_task():
+    """Выполняет одну задачу из очереди, чья попытка уже наступила.
+
+    Возвращает False, если таких задач нет.
+    """
+    with transaction.atomic():
+        task = (
+            GeocodingTask.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='P', next_attempt_at__lte=timezone.now())
+            .order_by('created_at')
+            .first()
+        )
+        if not task:
+            return False
+
+        task.attempts += 1
+        try:
+            with transaction.atomic():
+                save_place(task.address, raise_errors=True)
+        except Exception:
+            task.error = traceback.format_exc()
+            if task.attempts >= settings.GEOCODING_TASK_MAX_ATTEMPTS:
+                task.status = 'F'
+            else:
+                # пауза удваивается с каждой неудачной попыткой
+                delay = settings.GEOCODING_TASK_RETRY_DELAY * 2 ** (task.attempts - 1)
+                task.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+        else:
+            task.status = 'D'
+            task.error = ''
+        task.processed_at = timezone.now()
+        task.save()
+    return True
+
+
+def process_geocoding_tasks(limit=None):
+    """Разбирает очередь, пока в ней есть задачи. Возвращает число выполненных задач"""
+    processed = 0
+    while limit is None or processed < limit:
+        if not process_next_geocoding_task():
+            break
+        processed += 1
+    return processed
@@ -0,0 +1,105 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import Count, Q
+
+from foodcartapp.availability import get_availability_index, get_capable_restaurant_ids
+from foodcartapp.models import Order, Restaurant
+from placesapp.location_utils import get_places_coordinates
+from .geo_index import get_restaurant_geo_index
+
+
+RESULT_LABELS = {
+    'assigned': 'передано в рестораны',
+    'no_coordinates': 'адрес ещё не геокодирован',
+    'no_capable_restaurant': 'нет ресторана со всеми блюдами',
+    'too_far': f'ближайший подходящий ресторан дальше {settings.ASSIGNMENT_MAX_DISTANCE_KM:g} км',
+    'already_processed': 'уже обработаны другим менеджером',
+}
+
+
+def get_restaurants_load(restaurants):
+    """Сколько заказов сейчас готовит или везёт каждый ресторан"""
+    restaurants = Restaurant.objects.filter(
+        pk__in=[restaurant.id for restaurant in restaurants]
+    ).annotate(
+        active_orders=Count('orders', filter=Q(orders__status__in=['B', 'C']))
+    )
+    return {restaurant.id: restaurant.active_orders for restaurant in restaurants}
+
+
+def assign_restaurants(orders=None, balance_load=False):
+    """Передаёт необработанные заказы ближайшим ресторанам, способным их приготовить.
+
+    Кандидаты для каждого заказа берутся из гео-индекса ресторанов:
+    до NEAREST_RESTAURANTS_LIMIT ближайших не дальше ASSIGNMENT_MAX_DISTANCE_KM.
+    Заказы, рядом с которыми подходящих ресторанов нет, остаются необработанными.
+    С balance_load к расстоянию прибавляется ASSIGNMENT_LOAD_PENALTY_KM
+    за каждый заказ, который ресторан уже готовит, — так заказы
+    не скапливаются в одном ресторане. Возвращает счётчик исходов.
+    """
+    if orders is None:
+        orders = Order.objects.all()
+    orders = list(
+        orders
+        .filter(status='A', cooking_restaurant__isnull=True)
+        .prefetch_related('items')
+        .order_by('creation_at')
+    )
+    results = Counter()
+    if not orders:
+        return results
+
+    restaurants_by_id = Restaurant.objects.in_bulk()
+    coordinates = get_places_coordinates([order.address for order in orders])
+    geo_index = get_restaurant_geo_index()
+    loads = Counter()
+    if balance_load:
+        loads.update(get_restaurants_load(restaurants_by_id.values()))
+
+    availability_index = get_availability_index()
+    for order in orders:
+        order_coords = coordinates.get(order.address)
+        if not order_coords:
+            results['no_coordinates'] += 1
+            continue
+
+        restaurant_ids = get_capable_restaurant_ids(
+            availability_index,
+            [order_item.product_id for order_item in order.items.all()]
+        )
+        candidates = [
+            (restaurant_id, distance)
+            for restaurant_id, distance in geo_index.nearest(
+                order_coords,
+                restaurant_ids=restaurant_ids,
+                # без учёта загрузки нужен только ближайший
+                k=settings.NEAREST_RESTAURANTS_LIMIT if balance_load else 1,
+                radius_km=settings.ASSIGNMENT_MAX_DISTANCE_KM,
+            )
+            if restaurant_id in restaurants_by_id
+        ]
+        if not candidates:
+            located_restaurant_ids = restaurant_ids & geo_index.restaurants_coords.keys()
+            results['too_far' if located_restaurant_ids else 'no_capable_restaurant'] += 1
+            continue
+
+        best_restaurant_id, _ = min(
+            candidates,
+            key=lambda candidate: candidate[1] + loads[candidate[0]] * settings.ASSIGNMENT_LOAD_PENALTY_KM,
+        )
+
+        if order.pass_to_restaurant(restaurants_by_id[best_restaurant_id]):
+            results['assigned'] += 1
+            if balance_load:
+                loads[best_restaurant_id] += 1
+        else:
+            # статус заказа успел поменять менеджер
+            results['already_processed'] += 1
+    return results
+
+
+def format_assignment_results(results):
+    if not results:
+        return 'Необработанных заказов без ресторана нет'
+    return ', '.join(f'{RESULT_LABELS[result]}: {count}' for result, count in results.items())
@@ -0,0 +1,31 @@
+import math
+
+from django.conf import settings
+from geopy import distance
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_distance(from_point, to_point):
+    """Расстояние в км между точками (широта, долгота) по формуле гаверсинусов"""
+    from_lat, from_lon = map(math.radians, map(float, from_point))
+    to_lat, to_lon = map(math.radians, map(float, to_point))
+    hav = (
+        math.sin((to_lat - from_lat) / 2) ** 2
+        + math.cos(from_lat) * math.cos(to_lat) * math.sin((to_lon - from_lon) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(max(hav, 0), 1)))
+
+
+def geodesic_distance(from_point, to_point):
+    """То же, что haversine_distance, но точно по эллипсоиду. Заметно медленнее"""
+    return distance.distance(from_point, to_point).km
+
+
+def get_distances(from_point, to_points, exact=None):
+    """Расстояния в км от точки до каждой из to_points"""
+    if exact is None:
+        exact = settings.RESTAURANT_DISTANCE_EXACT
+    measure = geodesic_distance if exact else haversine_distance
+    return [measure(from_point, to_point) for to_point in to_points]
@@ -0,0 +1,149 @@
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from foodcartapp.models import Restaurant
+from placesapp.location_utils import get_places_coordinates
+from placesapp.normalization import normalize_address
+from .distances import get_distances
+
+
+GEO_INDEX_CACHE_KEY = 'restaurateur:geo_index'
+KM_PER_DEGREE = 111.32
+
+
+class RestaurantGeoIndex:
+    """Рестораны, разложенные по ячейкам сетки примерно cell_km × cell_km.
+
+    Поиск ближайших идёт кольцами ячеек от ячейки заказа и останавливается,
+    как только непросмотренные кольца заведомо дальше найденных ресторанов
+    или все кандидаты уже найдены, поэтому расстояния считаются только
+    до ресторанов поблизости. Немногих кандидатов проще перебрать напрямую.
+    """
+
+    # столько кандидатов и меньше дешевле просто перебрать
+    direct_search_size = 64
+
+    def __init__(self, restaurants_coords, cell_km, addresses=()):
+        self.restaurants_coords = dict(restaurants_coords)
+        # нормализованные адреса всех ресторанов, в том числе без координат:
+        # по ним сигналы понимают, что индекс пора перестроить
+        self.addresses = frozenset(addresses)
+        self.cells = defaultdict(list)
+
+        latitudes = [latitude for latitude, _ in self.restaurants_coords.values()] or [0]
+        reference_latitude = sum(latitudes) / len(latitudes)
+        self.lat_step = cell_km / KM_PER_DEGREE
+        self.lon_step = cell_km / (KM_PER_DEGREE * max(math.cos(math.radians(reference_latitude)), 0.01))
+        # ширина ячейки сужается к полюсу; берём худший случай среди ресторанов,
+        # чтобы оценка «дальше не бывает ближе» оставалась честной
+        max_latitude = max(abs(latitude) for latitude in latitudes)
+        self.min_cell_km = min(
+            cell_km,
+            self.lon_step * KM_PER_DEGREE * max(math.cos(math.radians(max_latitude)), 0.01),
+        )
+
+        for restaurant_id, coords in self.restaurants_coords.items():
+            self.cells[self.get_cell(coords)].append(restaurant_id)
+
+    def get_cell(self, coords):
+        latitude, longitude = coords
+        return math.floor(latitude / self.lat_step), math.floor(longitude / self.lon_step)
+
+    def iter_ring(self, center, ring):
+        row, column = center
+        if ring == 0:
+            yield center
+            return
+        for column_offset in range(-ring, ring + 1):
+            yield row - ring, column + column_offset
+            yield row + ring, column + column_offset
+        for row_offset in range(-ring + 1, ring):
+            yield row + row_offset, column - ring
+            yield row + row_offset, column + ring
+
+    def measure(self, coords, restaurant_ids):
+        restaurant_ids = list(restaurant_ids)
+        distances = get_distances(
+            coords,
+            [self.restaurants_coords[restaurant_id] for restaurant_id in restaurant_ids],
+        )
+        return list(zip(restaurant_ids, distances))
+
+    def nearest(self, coords, restaurant_ids=None, k=None, radius_km=None):
+        """До k ближайших ресторанов из restaurant_ids в радиусе radius_km.
+
+        Возвращает список пар (id ресторана, км), отсортированный по расстоянию.
+        """
+        candidates = set(self.restaurants_coords)
+        if restaurant_ids is not None:
+            candidates &= set(restaurant_ids)
+        if not candidates:
+            return []
+
+        if len(candidates) <= self.direct_search_size:
+            found = self.measure(coords, candidates)
+        else:
+            found = self.search_rings(coords, candidates, k, radius_km)
+
+        if radius_km is not None:
+            found = [(restaurant_id, distance) for restaurant_id, distance in found if distance <= radius_km]
+        found.sort(key=lambda item: item[1])
+        return found[:k] if k is not None else found
+
+    def search_rings(self, coords, candidates, k, radius_km):
+        center = self.get_cell(coords)
+        found = []
+        ring = 0
+        while len(found) < len(candidates):
+            if 8 * ring > len(self.cells):
+                # в кольце больше ячеек, чем непустых во всём индексе:
+                # дешевле досчитать оставшихся кандидатов напрямую
+                seen_ids = {restaurant_id for restaurant_id, _ in found}
+                found.extend(self.measure(coords, candidates - seen_ids))
+                break
+
+            ring_ids = [
+                restaurant_id
+                for cell in self.iter_ring(center, ring)
+                for restaurant_id in self.cells.get(cell, ())
+                if restaurant_id in candidates
+            ]
+            found.extend(self.measure(coords, ring_ids))
+
+            # всё, что лежит за этим кольцом, не ближе ring * min_cell_km
+            reachable_km = ring * self.min_cell_km
+            if radius_km is not None and reachable_km > radius_km:
+                break
+            if k is not None and sum(distance <= reachable_km for _, distance in found) >= k:
+                break
+            ring += 1
+        return found
+
+
+def build_restaurant_geo_index():
+    restaurants = list(Restaurant.objects.only('id', 'address'))
+    coordinates = get_places_coordinates([restaurant.address for restaurant in restaurants])
+    return RestaurantGeoIndex(
+        {
+            restaurant.id: coordinates[restaurant.address]
+            for restaurant in restaurants
+            if restaurant.address in coordinates
+        },
+        cell_km=settings.RESTAURANT_GEO_INDEX_CELL_KM,
+        addresses=[normalize_address(restaurant.address) for restaurant in restaurants],
+    )
+
+
+def get_restaurant_geo_index():
+    geo_index = cache.get(GEO_INDEX_CACHE_KEY)
+    if geo_index is None:
+        geo_index = build_restaurant_geo_index()
+        cache.set(GEO_INDEX_CACHE_KEY, geo_index, settings.MENU_CACHE_TIMEOUT)
+    return geo_index
+
+
+def invalidate_restaurant_geo_index():
+    cache.delete(GEO_INDEX_CACHE_KEY)
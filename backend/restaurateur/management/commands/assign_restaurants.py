@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from restaurateur.assignment import assign_restaurants, format_assignment_results
+
+
+class Command(BaseCommand):
+    help = 'Передаёт все необработанные заказы в ближайшие рестораны, способные их приготовить'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--balance-load',
+            action='store_true',
+            help='Учитывать, сколько заказов рестораны уже готовят',
+        )
+
+    def handle(self, *args, **options):
+        results = assign_restaurants(balance_load=options['balance_load'])
+        self.stdout.write(format_assignment_results(results))
@@ -0,0 +1,73 @@
+import random
+import time
+from collections import defaultdict, namedtuple
+
+from django.core.management.base import BaseCommand
+
+from foodcartapp.availability import get_capable_restaurant_ids
+
+
+MenuItem = namedtuple('MenuItem', ['restaurant_id', 'product_id', 'availability'])
+
+
+def find_restaurants_by_scan(menu_items, orders):
+    """Прежний способ: перебор всего меню для каждой позиции каждого заказа"""
+    orders_restaurants = []
+    for order_product_ids in orders:
+        restaurants = None
+        for product_id in order_product_ids:
+            product_restaurants = {
+                item.restaurant_id for item in menu_items
+                if item.availability and item.product_id == product_id
+            }
+            restaurants = product_restaurants if restaurants is None else restaurants & product_restaurants
+        orders_restaurants.append(restaurants or set())
+    return orders_restaurants
+
+
+def find_restaurants_by_index(menu_items, orders):
+    index = defaultdict(set)
+    for item in menu_items:
+        if item.availability:
+            index[item.product_id].add(item.restaurant_id)
+    index = {product_id: frozenset(restaurant_ids) for product_id, restaurant_ids in index.items()}
+    return [get_capable_restaurant_ids(index, order_product_ids) for order_product_ids in orders]
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает поиск подходящих ресторанов перебором меню и по индексу на синтетических данных'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--restaurants', type=int, default=30)
+        parser.add_argument('--products', type=int, default=200)
+        parser.add_argument('--orders', type=int, default=300)
+        parser.add_argument('--items-per-order', type=int, default=4)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rnd = random.Random(options['seed'])
+        menu_items = [
+            MenuItem(restaurant_id, product_id, rnd.random() < 0.9)
+            for restaurant_id in range(options['restaurants'])
+            for product_id in range(options['products'])
+        ]
+        orders = [
+            [rnd.randrange(options['products']) for _ in range(options['items_per_order'])]
+            for _ in range(options['orders'])
+        ]
+
+        started_at = time.perf_counter()
+        scanned = find_restaurants_by_scan(menu_items, orders)
+        scan_time = time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        indexed = find_restaurants_by_index(menu_items, orders)
+        index_time = time.perf_counter() - started_at
+
+        assert [set(restaurants) for restaurants in indexed] == scanned
+        self.stdout.write(
+            f'Пунктов меню: {len(menu_items)}, заказов: {len(orders)}\n'
+            f'Перебор меню: {scan_time:.3f} с\n'
+            f'Индекс доступности (с построением): {index_time:.3f} с\n'
+            f'Ускорение: {scan_time / index_time:.0f}x'
+        )
@@ -0,0 +1,20 @@
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from foodcartapp.models import Restaurant
+from placesapp.models import Place
+from .geo_index import GEO_INDEX_CACHE_KEY, invalidate_restaurant_geo_index
+
+
+@receiver([post_save, post_delete], sender=Restaurant)
+def invalidate_geo_index_on_restaurant_change(sender, **kwargs):
+    invalidate_restaurant_geo_index()
+
+
+@receiver([post_save, post_delete], sender=Place)
+def invalidate_geo_index_on_place_change(sender, instance, **kwargs):
+    # места геокодируются постоянно, но индекс зависит только от адресов ресторанов
+    geo_index = cache.get(GEO_INDEX_CACHE_KEY)
+    if geo_index is not None and instance.normalized_address in geo_index.addresses:
+        invalidate_restaurant_geo_index()
@@ -14,6 +14,10 @@ urlpatterns = [
 
     # TODO заглушка для нереализованного функционала
     path('orders/', views.view_orders, name="view_orders"),
+    path('orders/export/', views.export_orders, name="export_orders"),
+    path('orders/events/', views.view_order_events, name="order_events"),
+    path('orders/<int:order_id>/row/', views.view_order_row, name="order_row"),
+    path('orders/<int:order_id>/restaurants/', views.view_order_restaurants, name="order_restaurants"),
 
     path('login/', views.LoginView.as_view(), name="login"),
     path('logout/', views.LogoutView.as_view(), name="logout"),
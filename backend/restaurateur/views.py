@@ -1,19 +1,25 @@
 from django import forms
-from django.shortcuts import redirect, render
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
 from django.views import View
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.contrib.auth.decorators import user_passes_test
 from django.db.models import Sum
 from django.utils import timezone
 import requests
-from geopy import distance
 
 from django.contrib.auth import authenticate, login
 from django.contrib.auth import views as auth_views
 
-from foodcartapp.models import Product, Restaurant, Order, RestaurantMenuItem
-from placesapp.models import Place
-from placesapp.location_utils import fetch_coordinates
+from foodcartapp.models import Restaurant, Order
+from foodcartapp.availability import get_availability_index, get_capable_restaurant_ids
+from foodcartapp.menu_matrix import get_menu_matrix, iter_menu_matrix_rows
+from foodcartapp.exports import EXPORT_FORMATS, iter_order_records
+from foodcartapp.order_events import get_last_order_event_id, get_order_events, serialize_order_event
+from placesapp.location_utils import get_places_coordinates
+from .geo_index import get_restaurant_geo_index
 
 
 class Login(forms.Form):
@@ -70,21 +76,10 @@ def is_manager(user):
 
 @user_passes_test(is_manager, login_url='restaurateur:login')
 def view_products(request):
-    restaurants = list(Restaurant.objects.order_by('name'))
-    products = list(Product.objects.prefetch_related('menu_items'))
-
-    products_with_restaurant_availability = []
-    for product in products:
-        availability = {item.restaurant_id: item.availability for item in product.menu_items.all()}
-        ordered_availability = [availability.get(restaurant.id, False) for restaurant in restaurants]
-
-        products_with_restaurant_availability.append(
-            (product, ordered_availability)
-        )
-
+    menu_matrix = get_menu_matrix()
     return render(request, template_name="products_list.html", context={
-        'products_with_restaurant_availability': products_with_restaurant_availability,
-        'restaurants': restaurants,
+        'products_with_restaurant_availability': iter_menu_matrix_rows(menu_matrix),
+        'restaurants': menu_matrix['restaurants'],
     })
 
 
@@ -94,74 +89,197 @@ def view_restaurants(request):
         'restaurants': Restaurant.objects.all(),
     })
 
-def get_product_restaurants(restaurant_menu_items, order_item):
-    """Рестораны, которые могут приготовить продукт из заказа"""
-    product_restaurants = [
-        rest_item.restaurant for rest_item in restaurant_menu_items
-        if rest_item.availability and rest_item.product.id == order_item.product.id
-    ]
-    return product_restaurants
-
-
-def get_orders_with_distances():
-    orders = Order.objects \
-        .exclude(status='D') \
-        .prefetch_related('cooking_restaurant', 'items', 'items__product') \
-        .order_by('status').calculate_order_total_cost()
-
-    restaurant_menu_items = RestaurantMenuItem.objects.filter(availability=True)\
-        .select_related('product', 'restaurant')
-
-    places = Place.objects.filter(
-        address__in=[order.address for order in orders] + [rest.address for rest in Restaurant.objects.all()]
-    )
-    places = {place.address: place for place in places}
+def get_orders_with_distances(orders):
+    """Дополняет заказы подходящими ресторанами и расстояниями до ближайших из них"""
+    orders = list(orders)
+    availability_index = get_availability_index()
+    geo_index = get_restaurant_geo_index()
+    restaurants_by_id = Restaurant.objects.in_bulk()
+    coordinates = get_places_coordinates([order.address for order in orders])
 
     for order in orders:
-        order.restaurants = set()
         order.restaurant_distances_flag = True
-        for order_item in order.items.all():
-            # получаем рестораны, готовые приготовить текущий продукт из заказа
-            product_restaurants = get_product_restaurants(
-                restaurant_menu_items,
-                order_item
-            )
-
-            if not order.restaurants:
-                order.restaurants = set(product_restaurants)
-                continue
-            # из полученного списка определяем только рестораны,
-            # готовые приготовить и текущий, и остальные продукты
-            order.restaurants &= set(product_restaurants)
-
-        order_place = places.get(order.address)
-        order_coords = order_place.latitude, order_place.longitude
-        if None in order_coords:
+        # рестораны, готовые приготовить все продукты из заказа
+        restaurant_ids = get_capable_restaurant_ids(
+            availability_index,
+            [order_item.product_id for order_item in order.items.all()]
+        )
+        order.restaurants = {
+            restaurants_by_id[restaurant_id] for restaurant_id in restaurant_ids
+            if restaurant_id in restaurants_by_id
+        }
+
+        # адрес мог ещё не пройти очередь геокодирования
+        order_coords = coordinates.get(order.address)
+        if not order_coords:
             # флаг будет использован в шаблоне для
             # информирования о невозможности определения координат
             order.restaurant_distances_flag = False
-        else:
-            # если удалось определить координаты, считаем растояния до каждого ресторана
-            restaurant_distances = []
-            for restaurant in order.restaurants:
-                restaurant_place = places.get(restaurant.address)
-                restaurant_coords = restaurant_place.latitude, restaurant_place.longitude
-
-                restaurant_distance = round(
-                    distance.distance(order_coords, restaurant_coords).km, 2
-                )
-
-                restaurant_distances.append([restaurant.name, restaurant_distance])
-            restaurant_distances.sort(key=lambda x: x[1])
-            order.restaurant_distances = restaurant_distances
+            continue
+
+        # расстояния считаются только до ресторанов из соседних ячеек гео-индекса
+        nearest = geo_index.nearest(
+            order_coords,
+            restaurant_ids=restaurant_ids,
+            k=settings.NEAREST_RESTAURANTS_LIMIT,
+            radius_km=settings.NEAREST_RESTAURANTS_RADIUS_KM,
+        )
+        order.restaurant_distances = [
+            [restaurants_by_id[restaurant_id].name, round(distance, 2)]
+            for restaurant_id, distance in nearest
+            if restaurant_id in restaurants_by_id
+        ]
     return orders
 
 
+class OrdersFilterForm(forms.Form):
+    status = forms.ChoiceField(
+        label='Статус',
+        choices=[('', 'Все, кроме выполненных')] + list(Order.STATUS_CHOICES),
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    payment_method = forms.ChoiceField(
+        label='Способ оплаты',
+        choices=[('', 'Любой')] + list(Order.PAYMENT_METHOD_CHOICES),
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    created_from = forms.DateField(
+        label='Создан с',
+        required=False,
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'})
+    )
+    created_to = forms.DateField(
+        label='по',
+        required=False,
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'})
+    )
+
+    def filter_orders(self, orders):
+        filters = self.cleaned_data if self.is_valid() else {}
+
+        if filters.get('status'):
+            orders = orders.filter(status=filters['status'])
+        else:
+            orders = orders.exclude(status='D')
+        if filters.get('payment_method'):
+            orders = orders.filter(payment_method=filters['payment_method'])
+        return orders.created_between(filters.get('created_from'), filters.get('created_to'))
+
+
+def get_manager_orders(filter_form):
+    return filter_form.filter_orders(
+        Order.objects
+        .select_related('cooking_restaurant')
+        .prefetch_related('items')
+        .order_by('status', 'id')
+    )
+
+
 @user_passes_test(is_manager, login_url='restaurateur:login')
 def view_orders(request):
-    orders = get_orders_with_distances()
+    # события, случившиеся после отрисовки страницы, страница запросит сама
+    last_event_id = get_last_order_event_id()
+    filter_form = OrdersFilterForm(request.GET)
+    orders = get_manager_orders(filter_form)
+    paginator = Paginator(orders, settings.MANAGER_ORDERS_PER_PAGE)
+    page = paginator.get_page(request.GET.get('page'))
+
+    # расстояния считаем только для заказов на текущей странице
+    page.object_list = get_orders_with_distances(page.object_list)
+
+    query_params = request.GET.copy()
+    query_params.pop('page', None)
     return render(
         request,
         template_name='order_items.html',
-        context={'order_items': orders, 'path': request.path}
+        context={
+            'order_items': page.object_list,
+            'page': page,
+            'filter_form': filter_form,
+            'query_params': query_params.urlencode(),
+            'path': request.get_full_path(),
+            'last_event_id': last_event_id,
+            'events_poll_interval_ms': int(settings.ORDER_EVENTS_POLL_INTERVAL * 1000),
+        }
+    )
+
+
+@user_passes_test(is_manager, login_url='restaurateur:login')
+def view_order_row(request, order_id):
+    """Строка заказа для страницы заказов с теми же фильтрами.
+
+    Если заказ под фильтры больше не подходит, отвечает 204 — строку надо убрать.
+    """
+    filter_form = OrdersFilterForm(request.GET)
+    order = get_manager_orders(filter_form).filter(pk=order_id).first()
+    if not order:
+        return HttpResponse(status=204)
+
+    order, = get_orders_with_distances([order])
+    return render(
+        request,
+        template_name='order_item_row.html',
+        context={
+            'item': order,
+            'path': f'{reverse("restaurateur:view_orders")}?{request.GET.urlencode()}',
+        }
+    )
+
+
+@user_passes_test(is_manager, login_url='restaurateur:login')
+def view_order_events(request):
+    """События по заказам с id больше after, страница опрашивает их по таймеру.
+
+    Отвечает сразу, не дожидаясь новых событий. Если событий больше, чем
+    помещается в ответ, last_event_id укажет, откуда продолжить.
+    """
+    try:
+        after_id = int(request.GET['after'])
+    except (KeyError, ValueError):
+        return JsonResponse({'events': [], 'last_event_id': get_last_order_event_id()})
+
+    events = get_order_events(after_id, batch_size=settings.ORDER_EVENTS_BATCH_SIZE)
+    return JsonResponse({
+        'events': [serialize_order_event(event) for event in events],
+        'last_event_id': events[-1].id if events else after_id,
+    })
+
+
+@user_passes_test(is_manager, login_url='restaurateur:login')
+def view_order_restaurants(request, order_id):
+    order = get_object_or_404(Order.objects.prefetch_related('items'), pk=order_id)
+    order, = get_orders_with_distances([order])
+    return JsonResponse({
+        'id': order.id,
+        'coordinates_found': order.restaurant_distances_flag,
+        'restaurants': [
+            {'name': name, 'distance': distance}
+            for name, distance in getattr(order, 'restaurant_distances', [])
+        ],
+    })
+
+
+class OrdersExportForm(OrdersFilterForm):
+    """Те же фильтры, что на странице заказов: выгружается ровно то, что видит менеджер"""
+    format = forms.ChoiceField(choices=[(name, name) for name in EXPORT_FORMATS], required=False)
+
+
+@user_passes_test(is_manager, login_url='restaurateur:login')
+def export_orders(request):
+    form = OrdersExportForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse(form.errors, status=400)
+
+    export_format = form.cleaned_data['format'] or 'csv'
+    orders = form.filter_orders(
+        Order.objects.select_related('cooking_restaurant').order_by('id')
+    )
+    iter_lines, content_type = EXPORT_FORMATS[export_format]
+    response = StreamingHttpResponse(
+        iter_lines(iter_order_records(orders, chunk_size=settings.ORDERS_EXPORT_CHUNK_SIZE)),
+        content_type=content_type,
     )
+    response['Content-Disposition'] = f'attachment; filename="orders.{export_format}"'
+    return response
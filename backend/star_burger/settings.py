@@ -115,6 +115,18 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+# Кэш по умолчанию живёт в памяти процесса. Если gunicorn запущен с несколькими
+# воркерами, нужен общий кэш, например CACHE_BACKEND=django.core.cache.backends.db.DatabaseCache
+# и CACHE_LOCATION=cache_table (таблицу создаёт manage.py createcachetable)
+CACHES = {
+    'default': {
+        'BACKEND': env.str('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': env.str('CACHE_LOCATION', ''),
+    }
+}
+# сколько секунд хранить в кэше производные от меню ресторанов данные
+MENU_CACHE_TIMEOUT = env.int('MENU_CACHE_TIMEOUT', 60 * 60)
+
 INTERNAL_IPS = [
     '127.0.0.1'
 ]
@@ -126,6 +138,74 @@ STATICFILES_DIRS = [
 ]
 
 YANDEX_GEOCODER_API_KEY = env.str('YANDEX_GEOCODER_API_KEY')
+
+# db — задачи геокодирования складываются в таблицу и разбираются командой
+# run_geocoding_worker; sync — адрес геокодируется сразу, в процессе запроса
+GEOCODING_QUEUE_BACKEND = env.str('GEOCODING_QUEUE_BACKEND', 'db')
+GEOCODING_TASK_MAX_ATTEMPTS = env.int('GEOCODING_TASK_MAX_ATTEMPTS', 5)
+# пауза перед повтором задачи после сбоя геокодера, секунд; удваивается с каждой попыткой
+GEOCODING_TASK_RETRY_DELAY = env.int('GEOCODING_TASK_RETRY_DELAY', 60)
+
+# сколько секунд считать результат геокодирования свежим
+GEOCODER_CACHE_TTL = env.int('GEOCODER_CACHE_TTL', 30 * 24 * 60 * 60)
+GEOCODER_NEGATIVE_CACHE_TTL = env.int('GEOCODER_NEGATIVE_CACHE_TTL', 60 * 60)
+GEOCODER_LRU_SIZE = env.int('GEOCODER_LRU_SIZE', 4096)
+
+GEOCODER_URL = env.str('GEOCODER_URL', 'https://geocode-maps.yandex.ru/1.x')
+GEOCODER_CONNECT_TIMEOUT = env.float('GEOCODER_CONNECT_TIMEOUT', 3.05)
+GEOCODER_READ_TIMEOUT = env.float('GEOCODER_READ_TIMEOUT', 5)
+GEOCODER_RETRIES = env.int('GEOCODER_RETRIES', 2)
+GEOCODER_RETRY_BACKOFF = env.float('GEOCODER_RETRY_BACKOFF', 0.3)
+GEOCODER_POOL_SIZE = env.int('GEOCODER_POOL_SIZE', 10)
+# после скольких ошибок подряд перестать обращаться к геокодеру и на сколько секунд
+GEOCODER_BREAKER_THRESHOLD = env.int('GEOCODER_BREAKER_THRESHOLD', 5)
+GEOCODER_BREAKER_RESET_TIMEOUT = env.int('GEOCODER_BREAKER_RESET_TIMEOUT', 30)
+
+# True — считать расстояния до ресторанов точно по эллипсоиду (geopy), медленно;
+# False — по формуле гаверсинусов, быстрее и с погрешностью до 0,5 %
+RESTAURANT_DISTANCE_EXACT = env.bool('RESTAURANT_DISTANCE_EXACT', False)
+
+# сетка гео-индекса ресторанов: сторона ячейки в км
+RESTAURANT_GEO_INDEX_CELL_KM = env.float('RESTAURANT_GEO_INDEX_CELL_KM', 2.0)
+# сколько ближайших подходящих ресторанов показывать у заказа и в каком радиусе, км;
+# пустой радиус — без ограничения
+NEAREST_RESTAURANTS_LIMIT = env.int('NEAREST_RESTAURANTS_LIMIT', 5)
+NEAREST_RESTAURANTS_RADIUS_KM = env.float('NEAREST_RESTAURANTS_RADIUS_KM', None)
+
+# при автоназначении ресторанов: сколько км «штрафа» добавлять
+# за каждый заказ, который ресторан уже готовит
+ASSIGNMENT_LOAD_PENALTY_KM = env.float('ASSIGNMENT_LOAD_PENALTY_KM', 1.0)
+# дальше этого расстояния, км, заказ автоматически в ресторан не передаётся
+ASSIGNMENT_MAX_DISTANCE_KM = env.float('ASSIGNMENT_MAX_DISTANCE_KM', 30.0)
+
+MANAGER_ORDERS_PER_PAGE = env.int('MANAGER_ORDERS_PER_PAGE', 50)
+ORDERS_EXPORT_CHUNK_SIZE = env.int('ORDERS_EXPORT_CHUNK_SIZE', 2000)
+
+REST_FRAMEWORK = {
+    # сколько прокси перед Django дописывают адрес в X-Forwarded-For: в поставке это nginx.
+    # Без этого ключом лимита по IP становится весь заголовок, который присылает клиент
+    'NUM_PROXIES': env.int('NUM_PROXIES', 1),
+    # лимиты для публичного API заказов: 'число запросов/период', см. foodcartapp/throttling.py
+    'DEFAULT_THROTTLE_RATES': {
+        'order_ip': env.str('ORDER_IP_THROTTLE_RATE', '30/hour'),
+        'order_phone': env.str('ORDER_PHONE_THROTTLE_RATE', '10/hour'),
+        'order_batch': env.str('ORDER_BATCH_THROTTLE_RATE', '120/hour'),
+    },
+}
+
+# пакетная загрузка заказов партнёров: /api/orders/batch/
+ORDER_BATCH_MAX_SIZE = env.int('ORDER_BATCH_MAX_SIZE', 1000)
+ORDER_BATCH_CHUNK_SIZE = env.int('ORDER_BATCH_CHUNK_SIZE', 200)
+
+# сколько секунд помнить ответ на запрос с заголовком Idempotency-Key
+IDEMPOTENCY_KEY_TTL = env.int('IDEMPOTENCY_KEY_TTL', 24 * 60 * 60)
+
+# лента заказов для менеджеров: раз в сколько секунд страница спрашивает
+# новые события и сколько событий отдавать за один запрос
+ORDER_EVENTS_POLL_INTERVAL = env.float('ORDER_EVENTS_POLL_INTERVAL', 2.0)
+ORDER_EVENTS_BATCH_SIZE = env.int('ORDER_EVENTS_BATCH_SIZE', 100)
+# сколько секунд хранить события, см. команду clear_order_events
+ORDER_EVENTS_TTL = env.int('ORDER_EVENTS_TTL', 24 * 60 * 60)
 #
 # ROLLBAR = {
 #     'access_token': env('ROLLBAR_TOKEN', None),